@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from FAdo import fio
+from FAdo.common import DFAerror
+from FAdo.reex import str2regexp
+
+from NFA_DFA import nfa_to_dfa
+from DFA_MIN import minimize_dfa
+
+# Bump when the stored format or the pipeline output changes
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+PIPELINE_OPTIONS = {"nfa": "toNFA", "minimal": True}
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.environ.get("REGEX2DFA_CACHE_DIR") or os.path.join(base, "regex2dfa-fado")
+
+
+class DiskCache:
+    """
+    Content-addressed store of minimized DFAs (FAdo binary format) shared between processes.
+
+    Entries are written to a temporary file and renamed into place, so a reader never sees a
+    partial entry. An entry's modification time is its last use; once the directory is larger
+    than max_bytes the least recently used entries are removed.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, regex, alphabet, options):
+        payload = json.dumps([CACHE_FORMAT, regex, sorted(alphabet), options],
+                             sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".fab")
+
+    def get(self, key):
+        """Returns the cached DFA, or None"""
+        path = self.path(key)
+        try:
+            dfa = fio.readFromBinary(path)
+            os.utime(path)
+        except FileNotFoundError:
+            # Missing, or evicted meanwhile by another process
+            return None
+        except DFAerror:
+            # Empty, truncated or otherwise unreadable: a miss, and rewritten by the caller
+            self.discard(key)
+            return None
+        return dfa
+
+    def put(self, key, dfa):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(fio.toBinary(dfa))
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def discard(self, key):
+        """Removes an entry that could not be read back"""
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".fab"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def cached_min_dfa(regex, cache=None, **limits):
+    """
+    Minimized DFA for a regex, going through the cache when one is given.
+
+    Args:
+        regex (str): The regular expression.
+        cache (DiskCache): Optional on-disk cache.
+        **limits: maxStates, maxTransitions and timeout for the subset construction.
+
+    Returns:
+        DFA: The minimized DFA (states named by index), or None on failure.
+
+    Raises:
+        DFAbudgetExceeded: If the subset construction goes over one of the limits.
+    """
+    try:
+        parsed_regex = str2regexp(regex)
+    except Exception as e:
+        print(f"Error processing the regex: {e}")
+        return None
+
+    if cache is not None:
+        key = cache.key(str(parsed_regex), parsed_regex.Sigma, PIPELINE_OPTIONS)
+        dfa = cache.get(key)
+        if dfa is not None:
+            return dfa
+
+    nfa = parsed_regex.toNFA()
+    nfa.renameStates()
+    dfa = nfa_to_dfa(nfa, **limits)
+    minimized_dfa = minimize_dfa(dfa) if dfa else None
+    if minimized_dfa is None:
+        return None
+    minimized_dfa.renameStates()
+
+    if cache is not None:
+        cache.put(key, minimized_dfa)
+    return minimized_dfa
@@ -0,0 +1,95 @@
+import random
+
+
+class WordSampler:
+    """
+    Uniform random words, and the full list, of the words of a given length accepted by a DFA.
+
+    counts[n][q] is the number of words of length n leading from state q to a final state. The
+    table is filled one length at a time as longer words are asked for, with Python integers, so
+    counts stay exact however large they get. A word of length n is then drawn symbol by symbol,
+    each symbol with probability proportional to the number of accepted completions after it,
+    which makes every accepted word of that length equally likely and takes O(n) steps.
+    """
+
+    def __init__(self, dfa, rng=None):
+        self.dfa = dfa
+        self.rng = rng or random.Random()
+        # Outgoing (symbol, next state) pairs of each state, in symbol order
+        self.moves = [sorted(dfa.delta.get(state, {}).items()) for state in range(len(dfa.States))]
+        self.counts = [[1 if state in dfa.Final else 0 for state in range(len(dfa.States))]]
+
+    def extend(self, length):
+        # counts[n][q] = sum over the moves q --a--> p of counts[n - 1][p]
+        while len(self.counts) <= length:
+            previous = self.counts[-1]
+            self.counts.append([sum(previous[target] for _, target in moves) for moves in self.moves])
+
+    def count(self, length):
+        """Number of accepted words of the given length."""
+        if length < 0 or self.dfa.Initial is None:
+            return 0
+        self.extend(length)
+        return self.counts[length][self.dfa.Initial]
+
+    def sample(self, length):
+        """
+        An accepted word of the given length, uniformly at random.
+
+        Returns:
+            str: The word, or None if no word of that length is accepted.
+        """
+        total = self.count(length)
+        if not total:
+            return None
+        state = self.dfa.Initial
+        word = []
+        for remaining in range(length - 1, -1, -1):
+            # Pick the pick-th accepted word in symbol order among those left
+            pick = self.rng.randrange(total)
+            counts = self.counts[remaining]
+            for symbol, target in self.moves[state]:
+                if pick < counts[target]:
+                    break
+                pick -= counts[target]
+            word.append(symbol)
+            state = target
+            total = counts[target]
+        return "".join(word)
+
+    def sample_many(self, length, n):
+        """
+        n accepted words of the given length, drawn independently and uniformly (with repetitions).
+
+        Returns:
+            list: The words, empty if no word of that length is accepted.
+        """
+        if not self.count(length):
+            return []
+        return [self.sample(length) for _ in range(n)]
+
+    def words(self, length):
+        """
+        Every accepted word of the given length, in lexicographic order.
+
+        Only prefixes that can still be completed are followed, so the time is proportional to the
+        number of words produced rather than to the number of candidate strings.
+        """
+        if not self.count(length):
+            return
+        # Each entry is (state, prefix, index of the next move to try)
+        stack = [(self.dfa.Initial, "", 0)]
+        while stack:
+            state, prefix, i = stack.pop()
+            if len(prefix) == length:
+                yield prefix
+                continue
+            counts = self.counts[length - len(prefix) - 1]
+            moves = self.moves[state]
+            while i < len(moves) and not counts[moves[i][1]]:
+                i += 1
+            if i == len(moves):
+                continue
+            symbol, target = moves[i]
+            stack.append((state, prefix, i + 1))
+            stack.append((target, prefix + symbol, 0))
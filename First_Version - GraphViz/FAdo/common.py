@@ -251,6 +251,25 @@ class DFAstopped(DFAerror):
     pass
 
 
+class DFAbudgetExceeded(DFAerror):
+    """Subset construction stopped for going over one of its limits
+
+    Attributes:
+        limit (str): the limit hit: 'maxStates', 'maxTransitions' or 'timeout'
+        value: the setting of that limit
+        stats (dict): partial statistics: states, transitions, pending (states not yet expanded) and elapsed (seconds)
+
+    .. versionadded:: 2.2.1"""
+    def __init__(self, limit, value, stats):
+        self.limit = limit
+        self.value = value
+        self.stats = stats
+
+    def __str__(self):
+        return "Subset construction exceeded %s=%s (%d states, %d transitions, %.2f s)" % (
+            self.limit, self.value, self.stats["states"], self.stats["transitions"], self.stats["elapsed"])
+
+
 class DFAFileError(DFAerror):
     def __init(self, name):
         self.filename = name
@@ -869,31 +888,67 @@ class Drawable(object):
 class Word(object):
     """Class to implement generic words as iterables with pretty-print
 
-    Basically a unified way to deal with words with caracters of sizes different of one with no much fuss"""
+    Basically a unified way to deal with words with caracters of sizes different of one with no much fuss.
+
+    The symbols are kept in a tuple and the hash is computed once, so words are cheap to hash, compare
+    and copy, and duplicates share their symbols. Words are immutable: concatenation, slicing and append
+    build new words, so a word can safely be kept in a set or a dict.
+
+    .. versionchanged:: 2.2.1 tuple based and immutable, with ``__slots__`` and a cached hash; slicing and
+                        append return a new Word"""
+    __slots__ = ('data', '_hash')
+
     def __init__(self, data=None):
-        self.Sigma = set()
-        self.Epsilon = False
-        self.simple = True
         if data is None or data == Epsilon:
-            self.data = []
-            self.Epsilon = True
-        else:
-            self.data = []
-            for c in data:
-                self.data.append(c)
+            data = ()
+        elif type(data) is not tuple:
+            data = tuple(data)
+        object.__setattr__(self, 'data', data)
+        object.__setattr__(self, '_hash', hash(data))
+
+    @classmethod
+    def _fromTuple(cls, data):
+        new = object.__new__(cls)
+        object.__setattr__(new, 'data', data)
+        object.__setattr__(new, '_hash', hash(data))
+        return new
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Word objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Word objects are immutable")
+
+    def __reduce__(self):
+        return Word, (self.data,)
+
+    def __copy__(self):
+        return Word._fromTuple(self.data)
+
+    def __deepcopy__(self, memo):
+        return Word._fromTuple(self.data)
+
+    @property
+    def Epsilon(self):
+        return not self.data
+
+    @property
+    def Sigma(self):
+        """Set of the symbols of the word"""
+        return set(self.data)
+
+    @property
+    def simple(self):
+        """Whether all symbols are one character long"""
+        return all(len(c) == 1 for c in self.data)
 
     def __str__(self):
-        if self.Epsilon:
+        if not self.data:
             return Epsilon
-        else:
-            f = "'"
-            for i in self.data:
-                f += str(i)
-            f += "'"
-            return f
+        return "'" + "".join(str(i) for i in self.data) + "'"
 
     def __hash__(self):
-        return hash(repr(self))
+        return self._hash
 
     def __repr__(self):
         return "Word:%s" % self.__str__()
@@ -901,17 +956,21 @@ class Word(object):
     def __len__(self):
         return len(self.data)
 
+    def __iter__(self):
+        return iter(self.data)
+
     def __contains__(self, item):
         return item in self.data
 
     def __getitem__(self, item):
+        if type(item) is slice:
+            return Word._fromTuple(self.data[item])
         return self.data[item]
 
     def __eq__(self, other):
-        if self.Epsilon & other.Epsilon:
-            return True
-        else:
-            return self.data == other.data
+        if not isinstance(other, Word):
+            return NotImplemented
+        return self._hash == other._hash and self.data == other.data
 
     def __gt__(self, other):
         a, b = len(self.data), len(other.data)
@@ -943,27 +1002,28 @@ class Word(object):
         return self == other or self > other
 
     def append(self, value):
-        if len(value) != 1:
-            self.simple = False
-        if value != '':
-            self.Epsilon = False
-            self.Sigma.add(value)
-            self.data.append(value)
+        """The word with the symbol value added at the end; the empty string is ignored
+
+        :rtype: Word
+
+        .. versionchanged:: 2.2.1 returns a new Word instead of changing this one
+
+        .. attention:: copies the symbols, so building a word symbol by symbol is quadratic; collect
+                       them in a list and make a Word of it instead"""
+        if value == '':
+            return self
+        return Word._fromTuple(self.data + (value,))
 
     def dup(self):
-        return deepcopy(self)
+        return Word._fromTuple(self.data)
 
     def __add__(self, other):
         if not isinstance(other, Word):
             raise FAdoSyntacticError()
-        else:
-            new = self.dup()
-            for c in other:
-                new.append(c)
-            return new
+        return Word._fromTuple(self.data + other.data)
 
     def epsilonP(self):
-        return self.Epsilon
+        return not self.data
 
 
 class AllWords:
@@ -25,6 +25,28 @@ from .fa import NFA, OFA, DFA
 from .common import *
 from . import reex
 import itertools
+from functools import lru_cache
+
+
+@lru_cache(maxsize=128)
+def _internedAlphabet(symbols):
+    return symbols
+
+
+def internAlphabet(sigma):
+    """ Immutable alphabet shared by all the regular expressions built over the same set of symbols
+
+    Args:
+        sigma (set): alphabet symbols
+    Returns:
+        frozenset: the interned alphabet
+
+    .. note::
+       Regular expression nodes never change their alphabet in place, so state elimination can give every new node
+       the same object instead of a fresh copy of the automaton's alphabet.
+
+    .. versionadded:: 2.2.1"""
+    return _internedAlphabet(frozenset(sigma))
 
 
 def FA2GFA(aut):
@@ -150,8 +172,9 @@ def _commonCode1(gfa):
 
 def _commonCode2(gfa, aut, n):
     gfa.completeDelta()
+    sigma = internAlphabet(aut.Sigma)
     if n == 1:
-        return reex.CStar(gfa.delta[gfa.Initial][gfa.Initial], copy(aut.Sigma)).reduced()
+        return reex.CStar(gfa.delta[gfa.Initial][gfa.Initial], sigma).reduced()
     ii = gfa.Initial
     fi = list(gfa.Final)[0]
     a = gfa.delta[ii][ii]
@@ -159,11 +182,11 @@ def _commonCode2(gfa, aut, n):
     c = gfa.delta[fi][ii]
     d = gfa.delta[fi][fi]
     # bd*
-    re1 = reex.CConcat(b, reex.CStar(d, copy(aut.Sigma)), copy(aut.Sigma))
+    re1 = reex.CConcat(b, reex.CStar(d, sigma), sigma)
     # a + bd*c
-    re2 = reex.CDisj(a, reex.CConcat(re1, c, copy(aut.Sigma)), copy(aut.Sigma))
+    re2 = reex.CDisj(a, reex.CConcat(re1, c, sigma), sigma)
     # (a + bd*c)* bd*
-    return reex.CConcat(reex.CStar(re2, copy(aut.Sigma)), re1, copy(aut.Sigma)).reduced()
+    return reex.CConcat(reex.CStar(re2, sigma), re1, sigma).reduced()
 
 
 def FA2regexpSE(aut):
@@ -176,13 +199,13 @@ def FA2regexpSE(aut):
     new = aut.dup()
     new.trim()
     if not len(new.States):
-        return reex.CEmptySet(copy(aut.Sigma))
+        return reex.CEmptySet(internAlphabet(aut.Sigma))
     if not len(new.Final):
-        return reex.CEmptySet(copy(aut.Sigma))
+        return reex.CEmptySet(internAlphabet(aut.Sigma))
     if len(new.States) == 1 and len(new.delta) == 0:
-        return reex.CEpsilon(copy(aut.Sigma))
+        return reex.CEpsilon(internAlphabet(aut.Sigma))
     elif type(new) == NFA and len(new.Initial) != 0 and len(new.delta) == 0:
-        return reex.CEpsilon(copy(aut.Sigma))
+        return reex.CEpsilon(internAlphabet(aut.Sigma))
     gfa, n = _commonCode1(FA2GFA(new))
     lr = list(range(len(gfa.States) - n))
     gfa.eliminateAll(lr)
@@ -225,7 +248,7 @@ def SP2regexp(aut):
             rp = gfa.delta[list(gfa.predecessors[v])[0]][v]
         else:
             track = SPLabel([])
-            rp = reex.CEpsilon(copy(aut.Sigma))
+            rp = reex.CEpsilon(internAlphabet(aut.Sigma))
         try:
             # noinspection PyProtectedMember
             gfa._do_edges(v, track, rp)
@@ -261,7 +284,7 @@ def FAeliminateSingles(aut):
         i = list(gfa.predecessors[v])[0]
         o = list(gfa.delta[v].items())[0][0]
         if o in gfa.delta[i]:
-            gfa.delta[i][o] = reex.CDisj(reex.CConcat(gfa.delta[i][v], gfa.delta[v][o], copy(aut.Sigma)),
+            gfa.delta[i][o] = reex.CDisj(reex.CConcat(gfa.delta[i][v], gfa.delta[v][o], internAlphabet(aut.Sigma)),
                                          gfa.delta[i][o])
             new[io[i]].remove(i)
             new[io[o]].remove(o)
@@ -280,7 +303,7 @@ def FAeliminateSingles(aut):
                 new[io[o]] = [o]
             gfa.predecessors[o].remove(v)
         else:
-            gfa.delta[i][o] = reex.CConcat(gfa.delta[i][v], gfa.delta[v][o], copy(aut.Sigma))
+            gfa.delta[i][o] = reex.CConcat(gfa.delta[i][v], gfa.delta[v][o], internAlphabet(aut.Sigma))
             gfa.predecessors[o].remove(v)
             gfa.predecessors[o].add(i)
         del gfa.delta[i][v]
@@ -305,95 +328,240 @@ def FAeliminateSingles(aut):
     return gfa
 
 
-def FA2regexpCG(aut):
+class StateWeight(object):
+    """Elimination strategy: the heuristic weight of a state (:meth:`GFA.weight`)
+
+    A strategy gives the weight of a state, lower weights being eliminated first, and is told about every
+    elimination so it can update its own data.
+
+    .. versionadded:: 2.2.1"""
+
+    def start(self, gfa):
+        """Called once, before the first weight is asked
+
+        :param GFA gfa: the automaton"""
+        pass
+
+    def weight(self, gfa, st):
+        """Weight of a state
+
+        :param GFA gfa: the automaton
+        :param int st: state index
+        :rtype: int"""
+        return gfa.weight(st)
+
+    def eliminated(self, gfa, st):
+        """Called after a state is eliminated, before the weights of its neighbours are updated
+
+        :param GFA gfa: the automaton
+        :param int st: index of the eliminated state"""
+        pass
+
+
+class StateCycles(StateWeight):
+    """Elimination strategy: the number of cycles through a state, evaluated once at the start
+
+    :param dict cycles: number of cycles through each state, if already known
+
+    .. versionadded:: 2.2.1"""
+
+    def __init__(self, cycles=None):
+        self.cycles = cycles
+
+    def start(self, gfa):
+        if self.cycles is None:
+            self.cycles = gfa.evalNumberOfStateCycles()
+
+    def weight(self, gfa, st):
+        return self.cycles[st]
+
+
+class StateWeightWithCycles(StateCycles):
+    """Elimination strategy: the heuristic weight of a state scaled by the number of cycles through it
+    (:meth:`GFA.weightWithCycles`)
+
+    :param dict cycles: number of cycles through each state, if already known
+    :param bool dynamic: re-evaluate the cycles after each elimination
+
+    .. versionadded:: 2.2.1"""
+
+    def __init__(self, cycles=None, dynamic=False):
+        super(StateWeightWithCycles, self).__init__(cycles)
+        self.dynamic = dynamic
+
+    def weight(self, gfa, st):
+        return gfa.weightWithCycles(st, self.cycles)
+
+    def eliminated(self, gfa, st):
+        if self.dynamic:
+            self.cycles = gfa.evalNumberOfStateCycles()
+
+
+class EliminationScheduler(object):
+    """Order of elimination of the states of a GFA, lightest state first (ties go to the lowest index)
+
+    Weights are kept in an indexed binary heap; after each elimination only the weights of the neighbours of the
+    eliminated state are re-evaluated, as they are the only ones that change.
+
+    :param GFA gfa: the automaton
+    :param strategy: weight of the states (default :class:`StateWeight`)
+    :param candidates: states to be eliminated (default: all but the initial and final states)
+
+    .. versionadded:: 2.2.1"""
+
+    def __init__(self, gfa, strategy=None, candidates=None):
+        self.gfa = gfa
+        self.strategy = StateWeight() if strategy is None else strategy
+        self.strategy.start(gfa)
+        if candidates is None:
+            candidates = [st for st in range(len(gfa.States)) if st != gfa.Initial and st not in gfa.Final]
+        self._heap = sorted((self.strategy.weight(gfa, st), st) for st in candidates)
+        self._pos = dict((st, i) for (i, (_, st)) in enumerate(self._heap))
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, st):
+        return st in self._pos
+
+    def pop(self):
+        """Removes and returns the next state to eliminate
+
+        :rtype: int"""
+        heap = self._heap
+        _, st = heap[0]
+        last = heap.pop()
+        del self._pos[st]
+        if heap:
+            heap[0] = last
+            self._pos[last[1]] = 0
+            self._down(0)
+        return st
+
+    def update(self, states):
+        """Re-evaluates the weight of the given states; states not waiting for elimination are ignored
+
+        :param states: state indexes"""
+        for st in states:
+            i = self._pos.get(st)
+            if i is None:
+                continue
+            old = self._heap[i]
+            new = (self.strategy.weight(self.gfa, st), st)
+            self._heap[i] = new
+            if new < old:
+                self._up(i)
+            elif new > old:
+                self._down(i)
+
+    def eliminated(self, st, neighbours):
+        """Tells the strategy that a state was eliminated and updates the weights of its neighbours
+
+        :param int st: eliminated state
+        :param neighbours: states whose transitions changed"""
+        self.strategy.eliminated(self.gfa, st)
+        self.update(neighbours)
+
+    def _up(self, i):
+        heap, pos = self._heap, self._pos
+        item = heap[i]
+        while i:
+            parent = (i - 1) >> 1
+            if heap[parent] <= item:
+                break
+            heap[i] = heap[parent]
+            pos[heap[i][1]] = i
+            i = parent
+        heap[i] = item
+        pos[item[1]] = i
+
+    def _down(self, i):
+        heap, pos = self._heap, self._pos
+        n = len(heap)
+        item = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and heap[child + 1] < heap[child]:
+                child += 1
+            if item <= heap[child]:
+                break
+            heap[i] = heap[child]
+            pos[heap[i][1]] = i
+            i = child
+        heap[i] = item
+        pos[item[1]] = i
+
+
+def _eliminateScheduled(gfa, scheduler):
+    """State elimination in the order given by the scheduler, without renumbering states (see
+    :meth:`GFA.eliminateState`)"""
+    while scheduler:
+        m = scheduler.pop()
+        adj = (gfa.predecessors[m] | set(gfa.delta.get(m, ()))) - {m}
+        gfa.eliminateState(m, renumber=False)
+        scheduler.eliminated(m, adj)
+
+
+def _eliminateScheduled_nn(gfa, scheduler):
+    """Same as :func:`_eliminateScheduled` for the non normalised variants, that use :meth:`GFA.eliminate`"""
+    while scheduler:
+        m = scheduler.pop()
+        succs = set(a for a in gfa.delta[m] if a != m)
+        preds = set(a for a in gfa.predecessors[m] if a != m)
+        gfa.eliminate(m)
+        # update predecessors for weight(st)...
+        for s in succs:
+            gfa.predecessors[s].remove(m)
+            gfa.predecessors[s] |= preds
+        del gfa.predecessors[m]
+        scheduler.eliminated(m, succs | preds)
+
+
+def FA2regexpCG(aut, strategy=None):
     """Regular expression from state elimination whose language is recognised by the FA. Uses a heuristic to choose
     the order of elimination.
 
     :arg aut: the automaton
     :type aut: OFA
+    :param strategy: weight of the states, see :class:`EliminationScheduler` (default :class:`StateWeight`)
     :returns: the equivalent regular expression
-    :rtype: reex.RegExp"""
+    :rtype: reex.RegExp
+
+    .. versionchanged:: 2.2.1
+       the elimination order is kept in a heap (:class:`EliminationScheduler`); ``strategy`` parameter"""
     new = aut.dup()
     new.trim()
     gfa = FA2GFA(new)
     if not len(gfa.Final):
-        return reex.CEmptySet(copy(aut.Sigma))
+        return reex.CEmptySet(internAlphabet(aut.Sigma))
     gfa.normalize()
-    weights = {}
-    for st in range(len(gfa.States)):
-        if st != gfa.Initial and st not in gfa.Final:
-            weights[st] = gfa.weight(st)
-    for i in range(len(gfa.States) - 2):
-        m = [(v, u) for (u, v) in list(weights.items())]
-        m = min(m)
-        m = m[1]
-        # After 'm' is eliminated its adjacencies might
-        # change their indexes...
-        adj = set([])
-        for st in gfa.predecessors[m]:
-            if st > m:
-                adj.add(st - 1)
-            else:
-                adj.add(st)
-        for st in gfa.delta[m]:
-            if st > m:
-                adj.add(st - 1)
-            else:
-                adj.add(st)
-        gfa.eliminateState(m)
-        for st in weights:
-            if st > m:
-                weights[st - 1] = weights[st]
-        for st in adj:
-            if st != gfa.Initial and st not in gfa.Final:
-                weights[st] = gfa.weight(st)
-        del weights[len(gfa.States) - 2]
+    _eliminateScheduled(gfa, EliminationScheduler(gfa, strategy))
     return gfa.delta[gfa.Initial][list(gfa.Final)[0]].reduced()
 
 
-def FA2regexpCG_nn(aut: OFA):
+def FA2regexpCG_nn(aut: OFA, strategy=None):
     """Regular expression from state elimination whose language is recognised by the FA. Uses a heuristic to choose
     the order of elimination. The FA is not normalized before the state elimination.
 
     :arg aut: the automaton
     :type aut: OFA
+    :param strategy: weight of the states, see :class:`EliminationScheduler` (default :class:`StateWeight`)
     :returns: the equivalent regular expression
-    :rtype: reex.RegExp"""
+    :rtype: reex.RegExp
+
+    .. versionchanged:: 2.2.1
+       ``strategy`` parameter"""
     if not len(aut.Final):
-        return reex.CEmptySet(copy(aut.Sigma))
+        return reex.CEmptySet(internAlphabet(aut.Sigma))
     new = aut.dup()
     new.trim()
     gfa, n = _commonCode1(FA2GFA(new))
-    weights = {}
-    for st in range(len(gfa.States)):
-        if st != gfa.Initial and st not in gfa.Final:
-            weights[st] = gfa.weight(st)
-    for i in range(len(gfa.States) - n):
-        m = [(v, u) for (u, v) in list(weights.items())]
-        m = min(m)
-        m = m[1]
-        succs = set([])
-        for a in gfa.delta[m]:
-            if a != m:
-                succs.add(a)
-        preds = set([])
-        for a in gfa.predecessors[m]:
-            if a != m:
-                preds.add(a)
-        gfa.eliminate(m)
-        # update predecessors for weight(st)...
-        for s in succs:
-            gfa.predecessors[s].remove(m)
-            for s1 in preds:
-                gfa.predecessors[s].add(s1)
-        del gfa.predecessors[m]
-        for s in set(list(succs) + list(preds)):
-            if s != gfa.Initial and s not in gfa.Final:
-                weights[s] = gfa.weight(s)
-        del weights[m]
+    _eliminateScheduled_nn(gfa, EliminationScheduler(gfa, strategy))
     gfa.completeDelta()
     if n == 1:
-        return reex.CStar(gfa.delta[gfa.Initial][gfa.Initial], copy(aut.Sigma)).reduced()
+        return reex.CStar(gfa.delta[gfa.Initial][gfa.Initial], internAlphabet(aut.Sigma)).reduced()
     # noinspection PyProtectedMember
     return gfa._re0()
 
@@ -415,7 +583,7 @@ def FA2regexpSEO(aut, order=None):
     if order is None:
         order = list(range(len(gfa.States)))
     if not len(gfa.Final):
-        return reex.CEmptySet(copy(aut.Sigma))
+        return reex.CEmptySet(internAlphabet(aut.Sigma))
     gfa.normalize()
     while order:
         st = order.pop(0)
@@ -440,43 +608,16 @@ def FA2regexpDynamicCycleHeuristic(aut):
        results. Proc. of 11th Workshop on Descriptional Complexity of Formal Systems (DCFS10),
        pages 169-180.2010. DOI: 10.4204/EPTCS.31.16"""
     if not len(aut.Final):
-        return reex.CEmptySet(copy(aut.Sigma))
+        return reex.CEmptySet(internAlphabet(aut.Sigma))
     new = aut.dup()
     new.trim()
     gfa = FA2GFA(new)
-    cycles = gfa.evalNumberOfStateCycles()
+    strategy = StateWeightWithCycles(gfa.evalNumberOfStateCycles(), dynamic=True)
     gfa, n = _commonCode1(gfa)
-    weights = {}
-    for st in range(len(gfa.States)):
-        if st != gfa.Initial and st not in gfa.Final:
-            weights[st] = gfa.weightWithCycles(st, cycles)
-    for i in range(len(gfa.States) - n):
-        m = [(v, u) for (u, v) in list(weights.items())]
-        m = min(m)
-        m = m[1]
-        succs = set([])
-        for a in gfa.delta[m]:
-            if a != m:
-                succs.add(a)
-        preds = set([])
-        for a in gfa.predecessors[m]:
-            if a != m:
-                preds.add(a)
-        gfa.eliminate(m)
-        cycles = gfa.evalNumberOfStateCycles()
-        # update predecessors for weight(st)...
-        for s in succs:
-            gfa.predecessors[s].remove(m)
-            for s1 in preds:
-                gfa.predecessors[s].add(s1)
-        del gfa.predecessors[m]
-        for s in set(list(succs) + list(preds)):
-            if s != gfa.Initial and s not in gfa.Final:
-                weights[s] = gfa.weightWithCycles(s, cycles)
-        del weights[m]
+    _eliminateScheduled_nn(gfa, EliminationScheduler(gfa, strategy))
     gfa.completeDelta()
     if n == 1:
-        return reex.CStar(gfa.delta[gfa.Initial][gfa.Initial], copy(aut.Sigma))
+        return reex.CStar(gfa.delta[gfa.Initial][gfa.Initial], internAlphabet(aut.Sigma))
     # noinspection PyProtectedMember
     return gfa._re0()
 
@@ -495,40 +636,16 @@ def FA2regexpStaticCycleHeuristic(aut):
        results. Proc. of 11th Workshop on Descriptional Complexity of Formal Systems (DCFS10),
        pages 169-180.2010. DOI: 10.4204/EPTCS.31.16"""
     if not len(aut.Final):
-        return reex.CEmptySet(copy(aut.Sigma))
+        return reex.CEmptySet(internAlphabet(aut.Sigma))
     new = aut.dup()
     new.trim()
-    cycles = new.evalNumberOfStateCycles()
-    gfa, n = _commonCode1(new)
-    weights = {}
-    for st in range(len(gfa.States)):
-        if st != gfa.Initial and st not in gfa.Final:
-            weights[st] = gfa.weightWithCycles(st, cycles)
-    for i in range(len(gfa.States) - n):
-        m = [(v, u) for (u, v) in list(weights.items())]
-        m = min(m)
-        m = m[1]
-        succs = set([])
-        for a in gfa.delta[m]:
-            if a != m:
-                succs.add(a)
-        preds = set([])
-        for a in gfa.predecessors[m]:
-            if a != m:
-                preds.add(a)
-        gfa.eliminate(m)
-        for s in succs:
-            gfa.predecessors[s].remove(m)
-            for s1 in preds:
-                gfa.predecessors[s].add(s1)
-        del gfa.predecessors[m]
-        for s in set(list(succs) + list(preds)):
-            if s != gfa.Initial and s not in gfa.Final:
-                weights[s] = gfa.weightWithCycles(s, cycles)
-        del weights[m]
+    gfa = FA2GFA(new)
+    strategy = StateWeightWithCycles(gfa.evalNumberOfStateCycles())
+    gfa, n = _commonCode1(gfa)
+    _eliminateScheduled_nn(gfa, EliminationScheduler(gfa, strategy))
     gfa.completeDelta()
     if n == 1:
-        return reex.CStar(gfa.delta[gfa.Initial][gfa.Initial], copy(aut.Sigma))
+        return reex.CStar(gfa.delta[gfa.Initial][gfa.Initial], internAlphabet(aut.Sigma))
     # noinspection PyProtectedMember
     return gfa._re0()
 
@@ -547,7 +664,7 @@ def FA2regexpSE_nn(aut, order=None):
         order = []
     gfa = FA2GFA(aut)
     if not len(gfa.Final):
-        return reex.CEmptySet(copy(aut.Sigma))
+        return reex.CEmptySet(internAlphabet(aut.Sigma))
     if order is None:
         if len(gfa.Final) > 1:
             last = gfa.addState("Last")
@@ -590,10 +707,10 @@ def DFA2regexpDijkstra(aut) -> reex.RegExp:
         aut.reorder(foo)
     n, nstates = len(aut.Final), len(aut.States) - 1
     if not n:
-        return reex.CEmptySet(copy(aut.Sigma))
+        return reex.CEmptySet(internAlphabet(aut.Sigma))
     r = _RPath(aut, 0, uSet(aut.Final), nstates)
     for s in list(aut.Final)[1:]:
-        r = reex.CDisj(_RPath(aut, 0, s, nstates), r, copy(aut.Sigma))
+        r = reex.CDisj(_RPath(aut, 0, s, nstates), r, internAlphabet(aut.Sigma))
     return r
 
 
@@ -602,25 +719,25 @@ def _RPath(aut, initial, final, m):
     the RE from a DFA. This suppose that there are no disconnected states."""
     if m == -1:
         if initial == final:
-            r = reex.CEpsilon(copy(aut.Sigma))
+            r = reex.CEpsilon(internAlphabet(aut.Sigma))
             try:
                 for c in aut.delta[initial]:
                     if aut.delta[initial][c] == initial:
                         r = reex.CDisj(r,
-                                       reex.CAtom(c, copy(aut.Sigma)),
-                                       copy(aut.Sigma))
+                                       reex.CAtom(c, internAlphabet(aut.Sigma)),
+                                       internAlphabet(aut.Sigma))
             except KeyError:
                 pass
             return r.reduced()
         else:
-            r = reex.CEmptySet(copy(aut.Sigma))
+            r = reex.CEmptySet(internAlphabet(aut.Sigma))
             try:
                 for c in aut.delta[initial]:
                     if aut.delta[initial][c] == final:
                         if not r.emptysetP():
-                            r = reex.CDisj(r, reex.CAtom(c, copy(aut.Sigma)))
+                            r = reex.CDisj(r, reex.CAtom(c, internAlphabet(aut.Sigma)))
                         else:
-                            r = reex.CAtom(c, copy(aut.Sigma))
+                            r = reex.CAtom(c, internAlphabet(aut.Sigma))
             except KeyError:
                 pass
             return r.reduced()
@@ -628,10 +745,10 @@ def _RPath(aut, initial, final, m):
         r = reex.CDisj(_RPath(aut, initial, final, m - 1),
                        reex.CConcat(_RPath(aut, initial, m, m - 1),
                                     reex.CConcat(reex.CStar(_RPath(aut, m, m, m - 1),
-                                                            copy(aut.Sigma)),
+                                                            internAlphabet(aut.Sigma)),
                                                  _RPath(aut, m, final, m - 1),
-                                                 copy(aut.Sigma)),
-                                    copy(aut.Sigma)), copy(aut.Sigma))
+                                                 internAlphabet(aut.Sigma)),
+                                    internAlphabet(aut.Sigma)), internAlphabet(aut.Sigma))
     return r.reduced()
 
 
@@ -706,6 +823,38 @@ class GFA(OFA):
     def __init__(self):
         super(GFA, self).__init__()
         self.predecessors = None
+        self._alphabet = None
+        self._shared = set()
+
+    def setSigma(self, symbol_set):
+        super(GFA, self).setSigma(symbol_set)
+        self._alphabet = None
+
+    def addSigma(self, sym):
+        super(GFA, self).addSigma(sym)
+        self._alphabet = None
+
+    def alphabet(self):
+        """Interned, immutable copy of the alphabet, shared by the labels of the GFA
+
+        :rtype: frozenset
+
+        .. versionadded:: 2.2.1"""
+        if self._alphabet is None:
+            self._alphabet = internAlphabet(self.Sigma)
+        return self._alphabet
+
+    def _own(self, st):
+        """Gives a state its own transition row and predecessor set before they are changed, if they are still
+        shared with a duplicate (copy-on-write).
+
+        :param int st: state index"""
+        if st in self._shared:
+            self._shared.discard(st)
+            if st in self.delta:
+                self.delta[st] = dict(self.delta[st])
+            if self.predecessors is not None and st in self.predecessors:
+                self.predecessors[st] = set(self.predecessors[st])
 
     def __repr__(self):
         """GFA string representation
@@ -722,15 +871,17 @@ class GFA(OFA):
         :raises DFAepsilonRedefenition: if sym is Epsilon"""
         try:
             self.addSigma(sym)
-            sym = reex.CAtom(sym, copy(self.Sigma))
+            sym = reex.CAtom(sym, self.alphabet())
         except DFAepsilonRedefinition:
-            sym = reex.CEpsilon(copy(self.Sigma))
+            sym = reex.CEpsilon(self.alphabet())
+        self._own(sti1)
+        self._own(sti2)
         if sti1 not in self.delta:
             self.delta[sti1] = {}
         if sti2 not in self.delta[sti1]:
             self.delta[sti1][sti2] = sym
         else:
-            self.delta[sti1][sti2] = reex.CDisj(self.delta[sti1][sti2], sym, copy(self.Sigma))
+            self.delta[sti1][sti2] = reex.CDisj(self.delta[sti1][sti2], sym, self.alphabet())
         # TODO: write cleaner code and get rid of the general catch
         # noinspection PyBroadException
         try:
@@ -763,6 +914,7 @@ class GFA(OFA):
                     preds[dictio[s1]] = {dictio[s]}
         self.delta = delta
         self.predecessors = preds
+        self._shared = set()
 
         self.Initial = dictio[self.Initial]
         Final = set()
@@ -778,24 +930,26 @@ class GFA(OFA):
         """Eliminate a state.
 
         :param int st: state to be eliminated"""
+        self._own(st)
         if st in self.delta and st in self.delta[st]:
-            r2 = copy(reex.CStar(self.delta[st][st], copy(self.Sigma)))
+            r2 = copy(reex.CStar(self.delta[st][st], self.alphabet()))
             del self.delta[st][st]
         else:
             r2 = None
         for s in self.delta:
             if st not in self.delta[s]:
                 continue
+            self._own(s)
             r1 = copy(self.delta[s][st])
             del self.delta[s][st]
             for s1 in self.delta[st]:
                 r3 = copy(self.delta[st][s1])
                 if r2 is not None:
-                    r = reex.CConcat(r1, reex.CConcat(r2, r3, copy(self.Sigma)), copy(self.Sigma))
+                    r = reex.CConcat(r1, reex.CConcat(r2, r3, self.alphabet()), self.alphabet())
                 else:
-                    r = reex.CConcat(r1, r3, copy(self.Sigma))
+                    r = reex.CConcat(r1, r3, self.alphabet())
                 if s1 in self.delta[s]:
-                    self.delta[s][s1] = reex.CDisj(self.delta[s][s1], r, copy(self.Sigma))
+                    self.delta[s][s1] = reex.CDisj(self.delta[s][s1], r, self.alphabet())
                 else:
                     self.delta[s][s1] = r
         del self.delta[st]
@@ -810,14 +964,29 @@ class GFA(OFA):
     def dup(self):
         """ Returns a copy of a GFA
 
-        :rtype: GFA"""
+        Transition rows and predecessor sets are shared with the original until either GFA changes them, so
+        trying an elimination ordering on a duplicate only copies what the ordering touches. Labels are regular
+        expressions, which are never changed in place, and are always shared.
+
+        :rtype: GFA
+
+        .. versionchanged:: 2.2.1
+           copy-on-write instead of a deep copy"""
         new = GFA()
         new.States = copy(self.States)
         new.Sigma = copy(self.Sigma)
+        new._alphabet = self._alphabet
         new.Initial = self.Initial
         new.Final = copy(self.Final)
-        new.delta = deepcopy(self.delta)
-        new.predecessors = deepcopy(self.predecessors)
+        new.delta = dict(self.delta)
+        if self.predecessors is None:
+            new.predecessors = None
+            shared = set(self.delta)
+        else:
+            new.predecessors = dict(self.predecessors)
+            shared = set(self.delta) | set(self.predecessors)
+        self._shared |= shared
+        new._shared = set(shared)
         return new
 
     def normalize(self):
@@ -853,7 +1022,8 @@ class GFA(OFA):
                 self.lab[(v1, v2)].value.append(v1)
             else:
                 self.lab[(v1, v2)] = t.ref()
-                self.delta[v1][v2] = reex.CConcat(rp, self.delta[v1][v2], copy(self.Sigma))
+                self._own(v1)
+                self.delta[v1][v2] = reex.CConcat(rp, self.delta[v1][v2], self.alphabet())
 
     # noinspection PyUnresolvedReferences
     def _simplify(self, v2, i):
@@ -877,13 +1047,15 @@ class GFA(OFA):
                 v = self.lab[(vi, v2)].val()[-1]
                 self.out_index[v] -= 1
                 self.lab[(vo, v2)] = self.lab[(vi, v2)].ref()
-                self.delta[vi][v2] = reex.CDisj(self.delta[vo][v2], self.delta[vi][v2], copy(self.Sigma))
+                self._own(vi)
+                self._own(v2)
+                self.delta[vi][v2] = reex.CDisj(self.delta[vo][v2], self.delta[vi][v2], self.alphabet())
                 if self.out_index[v] == 1:
                     self.lab[(vi, v2)].assign(self.lab[(vi, v2)].val()[:-1])
                     try:
                         self.delta[vi][v2] = reex.CConcat(self.delta[list(self.predecessors[v])[0]][v],
                                                           self.delta[vi][v2],
-                                                          copy(self.Sigma))
+                                                          self.alphabet())
                     except IndexError:
                         pass
                 self.predecessors[v2].remove(vo)
@@ -904,16 +1076,28 @@ class GFA(OFA):
         :param s: state
         :param visited: list od states visited
         :param io:"""
-        if s not in visited:
-            visited.append(s)
-            if s in self.delta:
-                for dest in self.delta[s]:
-                    # lists are unhashable
-                    (i, o) = io[s]
-                    io[s] = (i, o + 1)
-                    (i, o) = io[dest]
-                    io[dest] = (i + 1, o)
-                    self.dfs_visit(dest, visited, io)
+        if s in visited:
+            return
+        visited.append(s)
+        # explicit stack of the pending children of each state on the path
+        stack = [iter(self.delta.get(s, ()))]
+        path = [s]
+        while stack:
+            for dest in stack[-1]:
+                src = path[-1]
+                # lists are unhashable
+                (i, o) = io[src]
+                io[src] = (i, o + 1)
+                (i, o) = io[dest]
+                io[dest] = (i + 1, o)
+                if dest not in visited:
+                    visited.append(dest)
+                    stack.append(iter(self.delta.get(dest, ())))
+                    path.append(dest)
+                    break
+            else:
+                stack.pop()
+                path.pop()
 
     def weight(self, state):
         """Calculates the weight of a state based on a heuristic
@@ -976,35 +1160,53 @@ class GFA(OFA):
                 self.predecessors[i].remove(st)
         del self.States[st]
 
-    def eliminateState(self, st):
+    def eliminateState(self, st, renumber=True):
         """ Deletes a state and updates the automaton
 
         :param int st: the state to be deleted
+        :param bool renumber: if False the other states keep their indexes and ``st`` is only disconnected
+           (it stays in ``States``), which avoids renumbering the whole automaton at each step
 
         .. attention:
-           works in place"""
+           works in place
+
+        .. versionchanged:: 2.2.1
+           ``renumber`` parameter"""
         for i in self.predecessors[st]:
             for j in self.delta[st]:
                 if i != st and j != st:
+                    self._own(i)
+                    self._own(j)
                     rex = self.delta[i][st]
                     if st in self.delta[st]:
-                        rex = reex.CConcat(rex, reex.CStar(self.delta[st][st], copy(self.Sigma)), copy(self.Sigma))
-                    rex = reex.CConcat(rex, self.delta[st][j], copy(self.Sigma))
+                        rex = reex.CConcat(rex, reex.CStar(self.delta[st][st], self.alphabet()), self.alphabet())
+                    rex = reex.CConcat(rex, self.delta[st][j], self.alphabet())
                     if j in self.delta[i]:
-                        rex = reex.CDisj(self.delta[i][j], rex, copy(self.Sigma))
+                        rex = reex.CDisj(self.delta[i][j], rex, self.alphabet())
                     self.delta[i][j] = rex
                     self.predecessors[j].add(i)
-        self.deleteState(st)
+        if renumber:
+            self.deleteState(st)
+            return
+        for i in self.predecessors.pop(st):
+            if i != st:
+                self._own(i)
+                del self.delta[i][st]
+        for j in self.delta.pop(st, ()):
+            if j != st:
+                self._own(j)
+                self.predecessors[j].discard(st)
 
     def completeDelta(self):
         """Adds empty set transitions between the automatons final and initial states in order to make it complete.
         It's only meant to be used in the final stage of SEA..."""
         for i in set([self.Initial] + list(self.Final)):
             for j in set([self.Initial] + list(self.Final)):
+                self._own(i)
                 if i not in self.delta:
                     self.delta[i] = {}
                 if j not in self.delta[i]:
-                    self.delta[i][j] = reex.CEmptySet(copy(self.Sigma))
+                    self.delta[i][j] = reex.CEmptySet(self.alphabet())
 
     def stateChildren(self, state, strict=False):
         """Set of children of a state
@@ -1031,11 +1233,11 @@ class GFA(OFA):
         d = self.delta[fi][fi]
 
         # bd*
-        re1 = reex.CConcat(b, reex.CStar(d), copy(self.Sigma))
+        re1 = reex.CConcat(b, reex.CStar(d), self.alphabet())
         # a + bd*c
-        re2 = reex.CDisj(a, reex.CConcat(re1, c, copy(self.Sigma)), copy(self.Sigma))
+        re2 = reex.CDisj(a, reex.CConcat(re1, c, self.alphabet()), self.alphabet())
         # (a + bd*c)* bd*
-        return reex.CConcat(reex.CStar(re2, copy(self.Sigma)), re1, copy(self.Sigma)).reduced()
+        return reex.CConcat(reex.CStar(re2, self.alphabet()), re1, self.alphabet()).reduced()
 
     # noinspection PyUnresolvedReferences
     def assignNum(self, st):
@@ -1045,11 +1247,19 @@ class GFA(OFA):
         self.num[st] = self.c
         self.c += 1
         self.visited.append(st)
-        if st in self.delta:
-            for d in self.delta[st]:
+        stack = [(st, iter(self.delta.get(st, ())))]
+        while stack:
+            s, children = stack[-1]
+            for d in children:
                 if d not in self.visited:
-                    self.parent[d] = st
-                    self.assignNum(d)
+                    self.parent[d] = s
+                    self.num[d] = self.c
+                    self.c += 1
+                    self.visited.append(d)
+                    stack.append((d, iter(self.delta.get(d, ()))))
+                    break
+            else:
+                stack.pop()
 
     # noinspection PyUnresolvedReferences
     def assignLow(self, st):
@@ -1057,19 +1267,26 @@ class GFA(OFA):
 
         :param st:"""
         self.low[st] = self.num[st]
-        if st in self.delta:
-            for d in self.delta[st]:
-                if self.num[d] > self.num[st]:
-                    self.assignLow(d)
-                    if self.low[d] >= self.low[st]:
-                        self.cuts.add(st)
-                    self.low[st] = min(self.low[st], self.low[d])
+        stack = [(st, iter(self.delta.get(st, ())))]
+        while stack:
+            s, children = stack[-1]
+            for d in children:
+                if self.num[d] > self.num[s]:
+                    self.low[d] = self.num[d]
+                    stack.append((d, iter(self.delta.get(d, ()))))
+                    break
+                if s in self.parent:
+                    if self.parent[s] != d:
+                        self.low[s] = min(self.low[s], self.num[d])
                 else:
-                    if st in self.parent:
-                        if self.parent[st] != d:
-                            self.low[st] = min(self.low[st], self.num[d])
-                    else:
-                        self.low[st] = self.num[st]
+                    self.low[s] = self.num[s]
+            else:
+                stack.pop()
+                if stack:
+                    p = stack[-1][0]
+                    if self.low[s] >= self.low[p]:
+                        self.cuts.add(p)
+                    self.low[p] = min(self.low[p], self.low[s])
 
     def evalNumberOfStateCycles(self):
         """Evaluates the number of cycles each state participates
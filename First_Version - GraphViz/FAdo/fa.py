@@ -39,6 +39,7 @@ Deterministic and non-deterministic automata manipulation, conversion and evalua
 
 from copy import copy
 from functools import cmp_to_key
+import time
 from collections import deque
 import deprecation
 import typing
@@ -46,7 +47,7 @@ import typing
 #import FAdo.fa
 from .common import *
 from .ssemigroup import SSemiGroup
-from .unionFind import UnionFind
+from .unionFind import IndexedUnionFind
 from . import graphs
 
 if typing.TYPE_CHECKING:
@@ -408,30 +409,12 @@ class FA(Drawable):
         Args:
             sti (int): index of the state to be removed
         Raises:
-            DFAstateUnknown: if state index does not exist"""
+            DFAstateUnknown: if state index does not exist
+
+        .. versionchanged:: 2.2.1 one pass of deleteStates() instead of a scan of delta per reference"""
         if sti >= len(self.States):
             raise DFAstateUnknown(sti)
-        else:
-            if sti in list(self.delta.keys()):
-                del self.delta[sti]
-            for j in list(self.delta.keys()):
-                for sym in list(self.delta[j].keys()):
-                    self._deleteRefInDelta(j, sym, sti)
-            if sti in self.Final:
-                self.Final.remove(sti)
-            self._deleteRefInitial(sti)
-            to_add = set()
-            to_del = set()
-            for s in self.Final:
-                if sti < s:
-                    to_del.add(s)
-                    to_add.add(s - 1)
-            self.Final = self.Final - to_del | to_add
-            for j in range(sti + 1, len(self.States)):
-                if j in self.delta:
-                    self.delta[j - 1] = self.delta[j]
-                    del self.delta[j]
-            del self.States[sti]
+        self.deleteStates({sti})
 
     def words(self, stringo=True):
         """Lexicographical word generator
@@ -974,7 +957,7 @@ class OFA(FA):
         .. attention::
            in place transformation"""
         useful = self.usefulStates()
-        del_states = [s for s in range(len(self.States)) if s not in useful]
+        del_states = set(range(len(self.States))) - useful
         if del_states:
             self.deleteStates(del_states)
         return self
@@ -1005,30 +988,16 @@ class OFA(FA):
         x.complete()
         return self.uniqueRepr() == x.uniqueRepr()
 
-    def _isAcyclic(self, s, visited, strict):
-        """Determines if from state s a cycle is reached
+    def adjacency(self, strict=True):
+        """Children of every state, as lists indexed by state
 
         Args:
-            s (int): state
-            visited (dict): marks visited states
-            strict (bool): if not True loops are allowed
+            strict (bool): if not True self loops are left out
         Returns:
-            bool:"""
-        if s not in visited:
-            visited[s] = 1
-            if s in self.delta:
-                for dest in self.stateChildren(s, strict):
-                    acyclic = self._isAcyclic(dest, visited, strict)
-                    if not acyclic:
-                        return False
-                visited[s] = 2
-            else:
-                visited[s] = 2
-                return True
-        else:
-            if visited[s] == 1:
-                return False
-        return True
+            list:
+
+        .. versionadded:: 2.2.1"""
+        return [list(self.stateChildren(s, strict)) if s in self.delta else [] for s in range(len(self.States))]
 
     def acyclicP(self, strict=True):
         """ Checks if the FA is acyclic
@@ -1036,23 +1005,10 @@ class OFA(FA):
         Args:
             strict (bool): if not True loops are allowed
         Returns: True if the FA is acyclic
-            bool: True if the FA is acyclic"""
-        visited = {}
-        for s in range(len(self.States)):
-            acyclic = self._isAcyclic(s, visited, strict)
-            if not acyclic:
-                return False
-        return True
+            bool: True if the FA is acyclic
 
-    def _topoSort(self, s, visited, lst):
-        """Auxiliar for topological order"""
-        if s not in visited:
-            visited.append(s)
-            if s in self.delta:
-                # noinspection PyTypeChecker
-                for dest in self.stateChildren(s, True):
-                    self._topoSort(dest, visited, lst)
-            lst.insert(0, s)
+        .. versionchanged:: 2.2.1 iterative, see graphs.acyclicP"""
+        return graphs.acyclicP(len(self.States), self.adjacency(strict))
 
     def topoSort(self):
         """Topological order for the FA
@@ -1061,12 +1017,10 @@ class OFA(FA):
             list: List of state indexes
 
         .. note::
-           self loops are taken in consideration"""
-        visited = []
-        lst = []
-        for s in range(len(self.States)):
-            self._topoSort(s, visited, lst)
-        return lst
+           self loops are taken in consideration
+
+        .. versionchanged:: 2.2.1 iterative, see graphs.topologicalSort"""
+        return graphs.topologicalSort(len(self.States), self.adjacency())
 
 class NFA(OFA):
     """Class for Non-deterministic Finite Automata (epsilon-transitions allowed).
@@ -1090,6 +1044,7 @@ class NFA(OFA):
         FA.__init__(self)
         self.Initial = set()
         self.epsilon_transitions = None
+        self._closures = None
 
     def __repr__(self):
         return "NFA({0:>s})".format(self.__str__())
@@ -1505,34 +1460,32 @@ class NFA(OFA):
 
         .. note::
            delta function will always be rebuilt, regardless of whether the states list to remove is a suffix,
-           or a sublist, of the automaton's states list."""
+           or a sublist, of the automaton's states list.
+
+        .. versionchanged:: 2.2.1 a single pass over delta with one renumbering map"""
+        del_states = set(del_states)
         rename_map = {}
-        new_delta = {}
-        new_final = set()
         new_states = []
-        for state in del_states:
-            if state in self.Initial:
-                self.Initial.remove(state)
-        for state in range(len(self.States)):
+        for state, name in enumerate(self.States):
             if state not in del_states:
                 rename_map[state] = len(new_states)
-                new_states.append(self.States[state])
-        for state in rename_map:
-            if state in self.Final:
-                new_final.add(rename_map[state])
-            if state not in self.delta:
+                new_states.append(name)
+        new_delta = {}
+        for state, transitions in self.delta.items():
+            new_state = rename_map.get(state)
+            if new_state is None:
                 continue
-            if not len(self.delta[state]) == 0:
-                new_delta[rename_map[state]] = {}
-            for symbol in self.delta[state]:
-                new_targets = set([rename_map[s] for s in self.delta[state][symbol]
-                                   if s in rename_map])
+            new_transitions = {}
+            for symbol, targets in transitions.items():
+                new_targets = {rename_map[t] for t in targets if t in rename_map}
                 if new_targets:
-                    new_delta[rename_map[state]][symbol] = new_targets
+                    new_transitions[symbol] = new_targets
+            if new_transitions:
+                new_delta[new_state] = new_transitions
         self.States = new_states
         self.delta = new_delta
-        self.Final = new_final
-        self.Initial = set([rename_map.get(x, x) for x in self.Initial])
+        self.Final = {rename_map[s] for s in self.Final if s in rename_map}
+        self.Initial = {rename_map[s] for s in self.Initial if s in rename_map}
 
     def addTransition(self, sti1, sym, sti2):
         """Adds a new transition. Transition is from ``sti1`` to ``sti2`` consuming symbol ``sym``. ``sti2`` is a
@@ -1544,6 +1497,8 @@ class NFA(OFA):
             sym (str): symbol consumed"""
         if sym != Epsilon:
             self.Sigma.add(sym)
+        else:
+            self._closures = None
         if sti1 not in self.delta:
             self.delta[sti1] = {sym: {sti2}}
         elif sym not in self.delta[sti1]:
@@ -1603,6 +1558,8 @@ class NFA(OFA):
            unused alphabet symbols will be discarded from sigma."""
         if not _no_check and (sti1 not in self.delta or sym not in self.delta[sti1]):
             return
+        if sym == Epsilon:
+            self._closures = None
         self.delta[sti1][sym].discard(sti2)
         if not self.delta[sti1][sym]:
             del self.delta[sti1][sym]
@@ -1677,17 +1634,63 @@ class NFA(OFA):
             set: the list of state indexes epsilon connected to ``st``
 
         .. attention::
-           ``st`` must exist beforehand."""
-        if type(st) is set:
-            s2 = set(st)
-        else:
-            s2 = {st}
-        s1 = set()
-        while s2:
-            s = s2.pop()
-            s1.add(s)
-            s2.update(self.delta.get(s, {}).get(Epsilon, set()) - s1)
-        return s1
+           ``st`` must exist beforehand.
+
+        .. versionchanged:: 2.2.1 looked up in the table of epsilonClosures()"""
+        closures = self.epsilonClosures()
+        if isinstance(st, (set, frozenset)):
+            s1 = set()
+            for s in st:
+                s1 |= closures[s] if 0 <= s < len(closures) else {s}
+            return s1
+        return set(closures[st]) if 0 <= st < len(closures) else {st}
+
+    def epsilonClosures(self):
+        """The epsilon closure of every state, as a list of frozensets indexed by state.
+
+        The table is computed once, condensing the strongly connected components of the epsilon transitions so that
+        the states of a component share one frozenset, and kept until an epsilon transition is added or removed,
+        a state is added or deleted, or delta is replaced. Code that changes epsilon transitions in delta directly
+        must call clearEpsilonClosures().
+
+        Returns:
+            list:
+
+        .. versionadded:: 2.2.1"""
+        cache = getattr(self, '_closures', None)
+        if cache is not None and cache[0] is self.delta and len(cache[1]) == len(self.States):
+            return cache[1]
+        delta = self.delta
+        eps = [delta[s].get(Epsilon, ()) if s in delta else () for s in range(len(self.States))]
+        closures = [None] * len(self.States)
+        # components come out sinks first, so the closures of their successors are already known
+        for component in graphs.stronglyConnectedComponents(len(self.States), eps):
+            closure = set(component)
+            for s in component:
+                for t in eps[s]:
+                    if 0 <= t < len(closures) and closures[t] is not None:
+                        closure |= closures[t]
+            closure = frozenset(closure)
+            for s in component:
+                closures[s] = closure
+        self._closures = (delta, closures)
+        return closures
+
+    def deleteState(self, sti):
+        """Remove the given state and the transitions related with that state.
+
+        Args:
+            sti (int): index of the state to be removed
+        Raises:
+            DFAstateUnknown: if state index does not exist"""
+        self._closures = None
+        super(NFA, self).deleteState(sti)
+
+    def clearEpsilonClosures(self):
+        """Forget the table of epsilonClosures(), after changing delta directly
+
+        .. versionadded:: 2.2.1"""
+        self._closures = None
 
     def closeEpsilon(self, st):
         """Add all non epsilon transitions from the states in the epsilon closure of given state to given state.
@@ -1723,6 +1726,8 @@ class NFA(OFA):
         .. attention:: in-place modification
 
         .. versionadded:: 0.9.6"""
+        if symbol == Epsilon:
+            self._closures = None
         for s in self.delta:
             if symbol in self.delta[s]:
                 del (self.delta[s][symbol])
@@ -1781,6 +1786,7 @@ class NFA(OFA):
             DFAsymbolUnknown: if symbol is not in alphabet"""
         if sym not in self.Sigma:
             raise DFAsymbolUnknown(sym)
+        closures = self.epsilonClosures()
         res = set()
         for s in stil:
             try:
@@ -1790,7 +1796,7 @@ class NFA(OFA):
             except NameError:
                 ls = set()
             for t in ls:
-                res.update(self.epsilonClosure(t))
+                res |= closures[t]
         return res
 
     def minimal(self):
@@ -1954,50 +1960,12 @@ class NFA(OFA):
         Returns:
             list:
 
-        .. versionadded:: 1.0"""
+        .. versionadded:: 1.0
 
-        def _strongConnect(st):
-            # todo This bombs out for a large automaton (loop exceed) Fixe it!
-            indices[st] = index[0]
-            lowlink[st] = index[0]
-            index[0] += 1
-            s.append(st)
-            in_indices[st] = True
-            in_s[st] = True
-            links = [x for k in self.delta.get(st, {}) for x in self.delta[st][k]]
-            # links = [self.delta[state][k] for k in self.delta.get(state, {})]
-            for l in links:
-                if not in_indices[l]:
-                    _strongConnect(l)
-                    lowlink[st] = min(lowlink[st], lowlink[l])
-                elif in_s[l]:
-                    lowlink[st] = min(lowlink[st], indices[l])
-            if lowlink[st] == indices[st]:
-                component = []
-                while True:
-                    l = s.pop()
-                    in_s[l] = False
-                    component.append(l)
-                    if l == st:
-                        break
-                result.append(component)
-
-        index = [0]
-        indices = []
-        lowlink = []
-        s = []
-        result = []
-        in_indices = []
-        in_s = []
-        for _ in self.States:
-            in_indices.append(False)
-            in_s.append(False)
-            indices.append(-1)
-            lowlink.append(-1)
-        for state in self.delta:
-            if not in_indices[state]:
-                _strongConnect(state)
-        return result
+        .. versionchanged:: 2.2.1 iterative, see graphs.stronglyConnectedComponents"""
+        links = [[x for k in self.delta[st] for x in self.delta[st][k]] if st in self.delta else []
+                 for st in range(len(self.States))]
+        return graphs.stronglyConnectedComponents(len(self.States), links, list(self.delta))
 
     def dotFormat(self, size="20,20", filename=None, direction="LR", strict=False, maxlblsz=6, sep="\n") -> str:
         """ A dot representation
@@ -2197,16 +2165,28 @@ class NFA(OFA):
             NFA:"""
         return self
 
-    def toDFA(self):
+    def toDFA(self, maxStates=None, maxTransitions=None, timeout=None):
         """Construct a DFA equivalent to this NFA, by the subset construction method.
 
+        Args:
+            maxStates (int): maximum number of states of the DFA
+            maxTransitions (int): maximum number of transitions of the DFA
+            timeout (float): maximum wall-clock time, in seconds
         Returns:
             DFA:
+        Raises:
+            DFAbudgetExceeded: if the construction goes over one of the limits (checked before expanding each state)
 
         .. note::
-           valid to epsilon-NFA"""
+           valid to epsilon-NFA
+
+        .. versionchanged:: 2.2.1
+           ``maxStates``, ``maxTransitions`` and ``timeout``"""
         if self.deterministicP():
             return self._toDFAd()
+        limited = maxStates is not None or maxTransitions is not None or timeout is not None
+        started = time.monotonic()
+        ntrans = 0
         dfa = DFA()
         l_states = []
         stl = self.epsilonClosure(self.Initial)
@@ -2219,6 +2199,9 @@ class NFA(OFA):
                 break
         index = 0
         while True:
+            if limited:
+                self._checkBudget(started, len(l_states), ntrans, len(l_states) - index, maxStates, maxTransitions,
+                                  timeout)
             slist = l_states[index]
             si = dfa.stateIndex(slist)
             for s in self.Sigma:
@@ -2235,12 +2218,30 @@ class NFA(OFA):
                 else:
                     foo = dfa.stateIndex(stl)
                 dfa.addTransition(si, s, foo)
+                ntrans += 1
             if index == len(l_states) - 1:
                 break
             else:
                 index += 1
+        if limited:
+            self._checkBudget(started, len(l_states), ntrans, 0, maxStates, maxTransitions, timeout)
         return dfa
 
+    @staticmethod
+    def _checkBudget(started, nstates, ntrans, pending, maxStates, maxTransitions, timeout):
+        """Raises DFAbudgetExceeded if a subset construction went over a limit (see :meth:`toDFA`)"""
+        elapsed = time.monotonic() - started
+        if maxStates is not None and nstates > maxStates:
+            limit, value = "maxStates", maxStates
+        elif maxTransitions is not None and ntrans > maxTransitions:
+            limit, value = "maxTransitions", maxTransitions
+        elif timeout is not None and elapsed > timeout:
+            limit, value = "timeout", timeout
+        else:
+            return
+        raise DFAbudgetExceeded(limit, value, {"states": nstates, "transitions": ntrans, "pending": pending,
+                                               "elapsed": elapsed})
+
     def hasTransitionP(self, state, symbol=None, target=None):
         """Whether there's a transition from given state, optionally through given symbol,
         and optionally to a specific target.
@@ -2347,7 +2348,7 @@ class NFA(OFA):
             raise NFAEmpty
         i1 = frozenset(self.Initial)
         i2 = frozenset([i + n for i in other.Initial])
-        s = UnionFind(auto_create=True)
+        s = IndexedUnionFind(auto_create=True)
         s.union(i1, i2)
         stack = [(i1, i2)]
         while stack:
@@ -2478,11 +2479,11 @@ class NFA(OFA):
                 for j in range(i + 1, n_states)
                 if (i, j) not in marked]
 
-    def equivReduced(self, equiv_classes :UnionFind):
+    def equivReduced(self, equiv_classes: IndexedUnionFind):
         """Equivalent NFA reduced according to given equivalence classes.
 
         Args:
-            equiv_classes (UnionFind): Equivalence classes
+            equiv_classes (IndexedUnionFind): Equivalence classes
         Returns:
             NFA: Equivalent NFA"""
         nfa = NFA()
@@ -2526,7 +2527,7 @@ class NFA(OFA):
         autobisimulation = self.autobisimulation()
         if not autobisimulation:
             return self.dup()
-        equiv_classes = UnionFind(auto_create=True)
+        equiv_classes = IndexedUnionFind(auto_create=True)
         for i in range(len(self.States)):
             equiv_classes.make_set(i)
         for i, j in autobisimulation:
@@ -2544,7 +2545,7 @@ class NFA(OFA):
         autobisimulation = self.reversal().autobisimulation()
         if not autobisimulation:
             return self.dup()
-        equiv_classes = UnionFind(auto_create=True)
+        equiv_classes = IndexedUnionFind(auto_create=True)
         for i in range(len(self.States)):
             equiv_classes.make_set(i)
         for i, j in autobisimulation:
@@ -2646,11 +2647,11 @@ class NFA(OFA):
         Returns:
             set: children states"""
         l = set([])
-        if state not in list(self.delta.keys()):
+        if state not in self.delta:
             return l
         for c in self.Sigma:
             if c in self.delta[state]:
-                l += self.delta[state][c]
+                l |= self.delta[state][c]
         if not strict:
             if state in l:
                 l.remove(state)
@@ -2706,6 +2707,7 @@ class NFA(OFA):
             if Epsilon not in c.delta[s]:
                 c.delta[s][Epsilon] = set([])
             c.delta[s][Epsilon].update(ss)
+        c.clearEpsilonClosures()
         return c
 
     def enumNFA(self, n=None):
@@ -2805,6 +2807,7 @@ class NFAr(NFA):
            It is up to the caller to remove the disconnected state. This can be achieved with ```trim()``."""
         if f is t:
             return
+        self._closures = None
         if f in self.delta:
             for symbol in self.delta[f]:
                 for state in self.delta[f][symbol]:
@@ -2855,6 +2858,7 @@ class NFAr(NFA):
             return
         if not target:
             target = min(tomerge)
+        self._closures = None
         # noinspection PyUnresolvedReferences
         tomerge.discard(target)
         for state in tomerge:
@@ -3131,32 +3135,30 @@ class DFA(OFA):
 
         .. note::
            delta function will always be rebuilt, regardless of whether the states list to remove is a suffix,
-           or a sublist, of the automaton's states list."""
+           or a sublist, of the automaton's states list.
+
+        .. versionchanged:: 2.2.1 a single pass over delta with one renumbering map"""
         if not del_states:
             return
+        del_states = set(del_states)
         rename_map = {}
-        old_delta = self.delta
-        self.delta = {}
-        new_final = set()
         new_states = []
-        for state in del_states:
-            if self.initialP(state):
-                self.Initial = None
-        for state in range(len(self.States)):
+        for state, name in enumerate(self.States):
             if state not in del_states:
                 rename_map[state] = len(new_states)
-                new_states.append(self.States[state])
-        for state in rename_map:
-            state_renamed = rename_map[state]
-            if state in self.Final:
-                new_final.add(state_renamed)
-            if state not in old_delta:
+                new_states.append(name)
+        new_delta = {}
+        for state, transitions in self.delta.items():
+            new_state = rename_map.get(state)
+            if new_state is None:
                 continue
-            for symbol, target in old_delta[state].items():
-                if target in rename_map:
-                    self.addTransition(state_renamed, symbol, rename_map[target])
+            new_transitions = {symbol: rename_map[target] for symbol, target in transitions.items()
+                               if target in rename_map}
+            if new_transitions:
+                new_delta[new_state] = new_transitions
         self.States = new_states
-        self.Final = new_final
+        self.delta = new_delta
+        self.Final = {rename_map[s] for s in self.Final if s in rename_map}
         if self.Initial is not None:
             # noinspection PyNoneFunctionAssignment
             self.Initial = rename_map.get(self.Initial, None)
@@ -4124,7 +4126,7 @@ class DFA(OFA):
 
         :returns: list of equivalence classes
         :rtype:list"""
-        uf = UnionFind(auto_create=True)
+        uf = IndexedUnionFind(auto_create=True)
         # eqstates = []
         for p in range(len(self.States)):
             for q in range(p + 1, len(self.States)):
@@ -4335,7 +4337,7 @@ class DFA(OFA):
         while pairs:
             equiv = True
             (p0, q0) = pairs.pop()
-            sets = UnionFind(auto_create=True)
+            sets = IndexedUnionFind(auto_create=True)
             sets.union(p0, q0)
             stack = [(p0, q0)]
             while stack:
@@ -4372,7 +4374,7 @@ class DFA(OFA):
             for q in range(n_states):
                 if q not in duped.Final:
                     duped.minimalIncr_neq.add(_normalizePair(p, q))
-        duped.minimalIncr_uf = UnionFind(auto_create=True)
+        duped.minimalIncr_uf = IndexedUnionFind(auto_create=True)
         for p in range(n_states):
             for q in range(p + 1, n_states):
                 if (p, q) in duped.minimalIncr_neq:
@@ -4458,7 +4460,7 @@ class DFA(OFA):
           automaton must be complete"""
         duped = self.dup()
         duped.complete()
-        duped.Equiv = UnionFind(auto_create=True)
+        duped.Equiv = IndexedUnionFind(auto_create=True)
         duped.Dist = set()
         nstates = len(self.States)
         max_depth = max(0, nstates - 2)
@@ -4603,7 +4605,7 @@ class DFA(OFA):
             raise NFAEmpty
         i1 = self.Initial
         i2 = self.Initial + n
-        s = UnionFind(auto_create=True)
+        s = IndexedUnionFind(auto_create=True)
         s.union(i1, i2)
         stack = [(i1, i2)]
         while stack:
@@ -4752,14 +4754,28 @@ class DFA(OFA):
         """ Merge states of almost equivalent partition. Used by hyperMinimal.
 
         :param ker:
-        :param aequiv: partition of almost equivalence"""
+        :param aequiv: partition of almost equivalence
+
+        .. versionchanged:: 2.2.1 all the merges are done with one deleteStates()"""
+        index = {name: i for i, name in enumerate(self.States)}
+        subst = {}
         for b in aequiv:
             try:
                 q = (aequiv[b] & ker).pop()
             except KeyError:
                 q = aequiv[b].pop()
             for p in aequiv[b] - ker:
-                self.mergeStates(self.stateIndex(p), self.stateIndex(q))
+                subst[index[p]] = index[q]
+        if not subst:
+            return
+        # as mergeStates for each pair; the targets q are never merged themselves
+        for transitions in self.delta.values():
+            for a, s in transitions.items():
+                if s in subst:
+                    transitions[a] = subst[s]
+        if self.Initial in subst:
+            self.setInitial(subst[self.Initial])
+        self.deleteStates(set(subst))
 
     def computeKernel(self):
         """ The Kernel of a ICDFA is the set of states that accept  a non-finite language.
@@ -4773,57 +4789,30 @@ class DFA(OFA):
 
         .. seealso:
            Holzer and A. Maletti, An nlogn Algorithm for Hyper-Minimizing a (Minimized) Deterministic Automata,
-           TCS 411(38-39): 3404-3413 (2010)"""
-
-        def _SCC(t):
-            ind[t] = self.i
-            low[t] = self.i
-            self.i += 1
-            stack.append(t)
-            for b in self.Sigma:
-                # noinspection PyNoneFunctionAssignment
-                t1 = self.delta.get(t, {}).get(b, None)
-                if t1 is not None and t1 not in ind:
-                    _SCC(t1)
-                    low[t] = min([low[t], low[t1]])
-                else:
-                    if t1 in stack:
-                        low[t] = min([low[t], ind[t1]])
-            if low[t] == ind[t]:
-                comp[t] = [t]
-                p = stack.pop()
-                while p != t:
-                    comp[t].append(p)
-                    p = stack.pop()
-
-        def _DFS(t):
-            mark[t] = 1
-            for a1 in self.Sigma:
-                # noinspection PyNoneFunctionAssignment
-                t1 = self.delta.get(t, {}).get(a1, None)
-                if t1 is not None and t1 not in mark:
-                    _DFS(t1)
-
-        ind = {}
-        low = {}
-        stack = []
-        self.i = 0
+           TCS 411(38-39): 3404-3413 (2010)
+
+        .. versionchanged:: 2.2.1 iterative"""
+        n = len(self.States)
+        links = [[self.delta[t][b] for b in self.Sigma if b in self.delta[t]] if t in self.delta else []
+                 for t in range(n)]
         comp = {}
+        for component in graphs.stronglyConnectedComponents(n, links, [self.Initial]):
+            # keyed by the state reached first, which also comes first in the list
+            comp[component[-1]] = component[-1:] + component[:-1]
         center = set([s for s in self.delta for a in self.delta[s] if self.delta[s][a] == s])
-        _SCC(self.Initial)
         for s in comp:
             if len(comp[s]) > 1:
                 center.update(comp[s])
         mark = {}
         for s in center:
             mark[s] = 1
-        for s in center:
-            for a in self.Sigma:
-                # noinspection PyNoneFunctionAssignment
-                s1 = self.delta.get(s, {}).get(a, None)
-                if s1 is not None and s1 not in mark:
-                    _DFS(s1)
-        del self.i
+        stack = list(center)
+        while stack:
+            s = stack.pop()
+            for s1 in links[s]:
+                if s1 not in mark:
+                    mark[s1] = 1
+                    stack.append(s1)
         return comp, center, mark
 
     def aEquiv(self):
@@ -4903,42 +4892,27 @@ class DFA(OFA):
             return new
 
     def stronglyConnectedComponents(self):
-        """Dummy method that uses the NFA conterpart
+        """Strong components, as for the NFA counterpart
 
          .. versionadded:: 1.3.3
 
+         .. versionchanged:: 2.2.1 computed on the DFA itself, see graphs.stronglyConnectedComponents
+
          :rtype: list"""
-        return self.toNFA().stronglyConnectedComponents()
+        links = [list(self.delta[st].values()) if st in self.delta else [] for st in range(len(self.States))]
+        return graphs.stronglyConnectedComponents(len(self.States), links, list(self.delta))
 
     def orderedStrConnComponents(self):
         """Topological ordered list of strong components
 
         .. versionadded:: 1.3.3
 
-        :rtype: list"""
-
-        def _topOrder(i1, j1):
-            if l1[str(j1)] in l[l1[str(i1)]]:
-                return -1
-            elif l1[str(i1)] in l[l1[str(j1)]]:
-                return 1
-            else:
-                return 0
+        .. versionchanged:: 2.2.1 the reverse of the order in which Tarjan's algorithm finds the components,
+           a proper topological order
 
+        :rtype: list"""
         comp = self.stronglyConnectedComponents()
-        l = [set([]) for _ in comp]
-        l1 = dict()
-        c = dict()
-        for i, x in enumerate(comp):
-            l1[str(x)] = i
-            for s in x:
-                c[s] = i
-        for s in range(len(self.States)):
-            for ch in self.delta.get(s, {}):
-                d = c[self.delta[s][ch]]
-                if d != c[s]:
-                    l[c[s]].add(d)
-        comp.sort(key=cmp_to_key(_topOrder))
+        comp.reverse()
         return comp
 
     def reversibleP(self):
@@ -5129,22 +5103,19 @@ class DFA(OFA):
         .. versionchanged:: 1.3.4"""
         if type(other) != type(self):
             raise FAdoGeneralError("Incompatible objects")
-        fa = self.product(other)
-        sz1, sz2 = len(self.States), len(other.States)
-        for s1 in self.Final:
-            for s2 in range(sz2 + 1):
-                fa.addFinal(s1 * (sz2 + 1) + s2)
-        for s2 in other.Final:
-            for s1 in range(sz1 + 1):
-                fa.addFinal(s1 * (sz2 + 1) + s2)
-        if trim:
-            fa.trim()
-        if complete:
-            fa.complete()
-        return fa._namesToString()
+        return unionDFAs([self, other], complete, trim)
 
     def __sub__(self, other):
-        return self & (~other)
+        """ Difference of two automata, without completing or complementing the other automaton
+
+        :param DFA other: the other automaton
+        :rtype: DFA
+
+        .. versionchanged:: 2.2.1"""
+        if not isinstance(other, DFA):
+            raise FAdoGeneralError("Incompatible objects")
+        new = _reachableProduct([self, other], lambda f: f[0] and not f[1], (0,))
+        return _finishProduct(new, False, True)
 
     def simDiff(self, other):
         """Symetrical difference
@@ -5172,43 +5143,12 @@ class DFA(OFA):
         :param bool trim: should the result be trim (default True)
         :rtype: DFA
 
-        .. note:: This version does not use the product method
+        .. note:: Only the pairs of states reachable from the pair of initial states are built
 
-        .. versionchanged:: 1.3.4"""
+        .. versionchanged:: 2.2.1"""
         if not isinstance(other, DFA):
             raise FAdoGeneralError("Incompatible objects")
-        new = DFA()
-        n_sigma = self.Sigma.union(other.Sigma)
-        new.setSigma(n_sigma)
-        sz1, sz2 = len(self.States), len(other.States)
-        for _ in range(sz1 * sz2):
-            new.addState()
-        new.setInitial(self.Initial * sz2 + other.Initial)
-        if not complete:
-            for s1 in range(sz1):
-                for s2 in range(sz2):
-                    sti = s1 * sz2 + s2
-                    for c in self.delta.get(s1, {}):
-                        if c in other.delta.get(s2, {}):
-                            new.addTransition(sti, c, self.delta[s1][c] * sz2 + other.delta[s2][c])
-        else:
-            last = new.addState()
-            for s1 in range(sz1):
-                for s2 in range(sz2):
-                    sti = s1 * sz2 + s2
-                    for c in n_sigma:
-                        if c in other.delta.get(s2, {}) and c in self.delta.get(s1, {}):
-                            new.addTransition(sti, c, self.delta[s1][c] * sz2 + other.delta[s2][c])
-                        else:
-                            new.addTransition(sti, c, last)
-            for c in n_sigma:
-                new.addTransition(last, c, last)
-        for s1 in self.Final:
-            for s2 in other.Final:
-                new.addFinal(s1 * sz2 + s2)
-        if trim:
-            new.trim()
-        return new
+        return intersectDFAs([self, other], complete, trim)
 
     def productSlow(self, other, complete=True):
         """ Returns a DFA resulting of the simultaneous execution of two DFA. No final states set.
@@ -6586,6 +6526,120 @@ def symbolDFA(sym, sigma=None) -> DFA:
     new.addTransition(s0, sym, s1)
     return new
 
+def _reachableProduct(dfas, accept, required):
+    """ Product of DFAs restricted to the state tuples reachable from the tuple of initial states
+
+    A component with no transition for a symbol is stopped and stays stopped; tuples where a component listed in
+    ``required`` is stopped, or where every component is stopped, are not built. Tuples are interned as a single
+    integer in mixed radix (the stopped state of component ``k`` is ``len(dfas[k])``).
+
+    :param list dfas: the DFAs
+    :param accept: function from the list of the components' finality to the finality of the tuple
+    :param required: indexes of the components that must not stop
+    :rtype: DFA
+
+    .. versionadded:: 2.2.1"""
+    new = DFA()
+    sigma = set().union(*[d.Sigma for d in dfas])
+    new.setSigma(sigma)
+    m = len(dfas)
+    radix = [len(d.States) + 1 for d in dfas]
+    deltas = [d.delta for d in dfas]
+    required = frozenset(required)
+    first = 0 in required
+    start = tuple(d.Initial for d in dfas)
+    if any(start[k] is None for k in required):
+        return new
+    index = {}
+    tuples = [start]
+    key = 0
+    for k in range(m):
+        key = key * radix[k] + (radix[k] - 1 if start[k] is None else start[k])
+    index[key] = 0
+    i = 0
+    while i < len(tuples):
+        t = tuples[i]
+        rows = [deltas[k].get(t[k], {}) if t[k] is not None else {} for k in range(m)]
+        row = {}
+        # When the first component is required only its symbols can lead anywhere
+        for c in (rows[0] if first else sigma):
+            nt = []
+            key = 0
+            alive = False
+            for k in range(m):
+                s = rows[k].get(c)
+                if s is None:
+                    if k in required:
+                        break
+                    key = key * radix[k] + radix[k] - 1
+                else:
+                    alive = True
+                    key = key * radix[k] + s
+                nt.append(s)
+            else:
+                if alive:
+                    j = index.get(key)
+                    if j is None:
+                        j = index[key] = len(tuples)
+                        tuples.append(tuple(nt))
+                    row[c] = j
+        if row:
+            new.delta[i] = row
+        i += 1
+    new.States = [str(j) for j in range(len(tuples))]
+    new.setInitial(0)
+    finals = [d.Final for d in dfas]
+    for j, t in enumerate(tuples):
+        if accept([t[k] is not None and t[k] in finals[k] for k in range(m)]):
+            new.addFinal(j)
+    return new
+
+
+def intersectDFAs(dfas, complete=False, trim=True) -> DFA:
+    """ Intersection of any number of DFAs, building only the reachable part of their product
+
+    :param list dfas: the DFAs
+    :param bool complete: should the result be complete (default False)
+    :param bool trim: should the result be trim (default True)
+    :rtype: DFA
+
+    .. versionadded:: 2.2.1"""
+    dfas = list(dfas)
+    if not dfas or not all(isinstance(d, DFA) for d in dfas):
+        raise FAdoGeneralError("Incompatible objects")
+    new = _reachableProduct(dfas, all, range(len(dfas)))
+    return _finishProduct(new, complete, trim)
+
+
+def unionDFAs(dfas, complete=True, trim=True) -> DFA:
+    """ Union of any number of DFAs, building only the reachable part of their product
+
+    :param list dfas: the DFAs
+    :param bool complete: should the result be complete (default True)
+    :param bool trim: should the result be trim (default True)
+    :rtype: DFA
+
+    .. versionadded:: 2.2.1"""
+    dfas = list(dfas)
+    if not dfas or not all(isinstance(d, DFA) for d in dfas):
+        raise FAdoGeneralError("Incompatible objects")
+    new = _reachableProduct(dfas, any, ())
+    return _finishProduct(new, complete, trim)
+
+
+def _finishProduct(new, complete, trim):
+    """ Common final steps of the reachable product constructions"""
+    if not new.States:
+        # No initial tuple: empty language
+        i = new.addState()
+        new.setInitial(i)
+    if trim:
+        new.trim()
+    if complete:
+        new.complete()
+    return new
+
+
 def _addPool(pool :set, done :set, val):
     """ Adds to a pool with exception list
 
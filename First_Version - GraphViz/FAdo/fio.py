@@ -24,6 +24,11 @@ FAdo I/O methods. The parsing grammars for most of the objects reside here.
    675 Mass Ave, Cambridge, MA 02139, USA."""
 
 import io
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
 from . import common
 from . fa import DFA, NFA, statePP
 from . transducers import SFT, GFT, Transducer
@@ -112,6 +117,150 @@ def readOneFromString(s):
     return BuildFadoObject().transform(tree)
 
 
+def iterFromFile(FileName):
+    """Lazily reads the finite automata defined in a file, one at a time.
+
+    :param str FileName: file name
+    :rtype: generator
+
+    Only the ``@DFA`` and ``@NFA`` sections of the format described in :func:`readFromFile` are accepted. The file
+    is consumed line by line and the transition function of each automaton is built directly, without a parse tree,
+    so memory usage is bounded by the size of the automaton being built rather than by the size of the file.
+
+    .. note::
+       A line with a single name declares a state, which is created at that point.
+
+    .. versionadded:: 2.2.1"""
+    with open(FileName, "r") as file:
+        for aut in _iterFAdoLines(file):
+            yield aut
+
+
+def iterFromString(s):
+    """Lazily reads the finite automata defined in a string, one at a time.
+
+    .. seealso::
+        iterFromFile for the restrictions of this reader
+
+    :param str s: the string
+    :rtype: generator
+
+    .. versionadded:: 2.2.1"""
+    return _iterFAdoLines(io.StringIO(s))
+
+
+def _unquote(tok):
+    if len(tok) > 1 and tok[0] == "\"" and tok[-1] == "\"":
+        return tok[1:-1]
+    return tok
+
+
+def _lineTokens(line):
+    """Splits a line of the FAdo format into names, dropping comments"""
+    toks = []
+    for tok in line.split():
+        if tok[0] == "\"":
+            toks.append(tok)
+            continue
+        i = tok.find("#")
+        if i == -1:
+            toks.append(tok)
+        else:
+            if i:
+                toks.append(tok[:i])
+            break
+    return toks
+
+
+def _iterFAdoLines(lines):
+    """Builds automata from an iterable of lines of the FAdo format
+
+    :param lines: iterable of strings
+    :rtype: generator"""
+    aut, names = None, None
+    nfap, initial, finals = False, True, []
+    for lineno, line in enumerate(lines, 1):
+        toks = _lineTokens(line)
+        if not toks:
+            continue
+        head = toks[0]
+        if head[0] == "@" and head != "@epsilon":
+            if aut is not None:
+                for x in finals:
+                    aut.addFinal(_nameIndex(aut, names, x))
+                yield aut
+            if head == "@DFA":
+                aut, nfap = DFA(), False
+            elif head == "@NFA":
+                aut, nfap = NFA(), True
+            else:
+                raise common.FAdoNotImplemented("streaming reader does not handle {0:>s} (line {1:d})"
+                                                .format(head, lineno))
+            names, finals, initials, sigma = {}, [], [], []
+            dest = finals
+            for tok in toks[1:]:
+                if tok == "*" and nfap and dest is finals:
+                    dest = initials
+                elif tok == "$" and dest is not sigma:
+                    dest = sigma
+                else:
+                    dest.append(_unquote(tok))
+            for x in sigma:
+                aut.addSigma(x)
+            for x in initials:
+                aut.addInitial(_nameIndex(aut, names, x))
+            initial = not initials
+            continue
+        if aut is None:
+            raise common.DFASyntaticError(lineno)
+        if len(toks) == 1:
+            _nameIndex(aut, names, _unquote(head))
+            continue
+        if len(toks) != 3:
+            raise common.DFASyntaticError(lineno)
+        i0 = _nameIndex(aut, names, _unquote(head))
+        i1 = _nameIndex(aut, names, _unquote(toks[2]))
+        sym = toks[1]
+        if sym == "@epsilon":
+            if not nfap:
+                raise common.DFAnotNFA("Invalid Epsilon transition from {0:>s} to {1:>s}.".format(str(i0), str(i1)))
+            sym = common.Epsilon
+        else:
+            sym = _unquote(sym)
+            aut.Sigma.add(sym)
+        row = aut.delta.get(i0)
+        if row is None:
+            aut.delta[i0] = {sym: {i1}} if nfap else {sym: i1}
+        elif nfap:
+            if sym in row:
+                row[sym].add(i1)
+            else:
+                row[sym] = {i1}
+        else:
+            if row.get(sym, i1) != i1:
+                raise common.DFAnotNFA("extra transition from ({0:>s}, {1:>s})".format(str(i0), sym))
+            row[sym] = i1
+        if initial:
+            if nfap:
+                aut.addInitial(i0)
+            else:
+                aut.setInitial(i0)
+            initial = False
+    if aut is not None:
+        for x in finals:
+            aut.addFinal(_nameIndex(aut, names, x))
+        yield aut
+
+
+def _nameIndex(aut, names, name):
+    """Index of a state name, creating the state if needed, using a dictionary instead of ``States.index``"""
+    i = names.get(name)
+    if i is None:
+        i = names[name] = len(aut.States)
+        aut.States.append(name)
+    return i
+
+
 def alphabetPP(sigma):
     ssig = "[ \"{0:>s}\"".format(str(sigma.pop()))
     for sym in sigma:
@@ -296,6 +445,243 @@ def saveToFile(FileName, fa, mode="a"):
     f.close()
 
 
+_BIN_MAGIC = b"FAdB"
+_BIN_VERSION = 1
+_BIN_DFA, _BIN_NFA = 0, 1
+_BIN_EPSILON = 0xFFFFFFFF
+# magic, version, kind, reserved, #states, #symbols, #transitions, #initial states
+_BIN_HEADER = struct.Struct("<4sHBBIIII")
+
+
+def _u32(values):
+    a = array("I", values)
+    if a.itemsize != 4:
+        a = array("L", values)
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a.tobytes()
+
+
+def toBinary(aut):
+    """ Compact binary representation of a DFA or NFA
+
+    :param DFA|NFA aut: the automaton
+    :rtype: bytes
+
+    The layout (all integers are little-endian unsigned 32 bits, sections aligned to 4 bytes) is a header, the
+    symbol table (UTF-8, length prefixed), the initial states, the transitions in compressed sparse row form
+    (``rows[s]:rows[s+1]`` indexes the symbol and target arrays of state ``s``, sorted by symbol index) and a bitmap
+    of final states. Epsilon transitions use the symbol index ``0xFFFFFFFF``.
+
+    .. note::
+       State names are not stored: a loaded automaton has its states named by their indexes. Symbols are stored as
+       strings.
+
+    .. versionadded:: 2.2.1"""
+    if isinstance(aut, DFA):
+        kind, initial = _BIN_DFA, [] if aut.Initial is None else [aut.Initial]
+    elif isinstance(aut, NFA):
+        kind, initial = _BIN_NFA, sorted(aut.Initial)
+    else:
+        raise common.DFAerror()
+    n = len(aut.States)
+    sigma = sorted(str(x) for x in aut.Sigma)
+    symi = {x: i for i, x in enumerate(sigma)}
+    symi[str(common.Epsilon)] = _BIN_EPSILON
+    rows, syms, dests = [0], [], []
+    for s in range(n):
+        for c, d in sorted(((symi[str(c)], d) for c, d in aut.delta.get(s, {}).items())):
+            for t in (sorted(d) if kind == _BIN_NFA else (d,)):
+                syms.append(c)
+                dests.append(t)
+        rows.append(len(syms))
+    out = io.BytesIO()
+    out.write(_BIN_HEADER.pack(_BIN_MAGIC, _BIN_VERSION, kind, 0, n, len(sigma), len(syms), len(initial)))
+    for x in sigma:
+        b = x.encode("utf-8")
+        out.write(_u32([len(b)]))
+        out.write(b)
+    out.write(b"\0" * (-out.tell() % 4))
+    out.write(_u32(initial))
+    out.write(_u32(rows))
+    out.write(_u32(syms))
+    out.write(_u32(dests))
+    bitmap = bytearray((n + 7) // 8)
+    for s in aut.Final:
+        bitmap[s >> 3] |= 1 << (s & 7)
+    out.write(bytes(bitmap))
+    return out.getvalue()
+
+
+def saveToBinary(FileName, aut):
+    """ Saves a DFA or NFA to a file using the binary format of :func:`toBinary`
+
+    :param str FileName: file name
+    :param DFA|NFA aut: the automaton
+
+    .. versionadded:: 2.2.1"""
+    try:
+        f = open(FileName, "wb")
+    except IOError:
+        raise common.DFAerror()
+    f.write(toBinary(aut))
+    f.close()
+
+
+def readFromBinary(FileName):
+    """ Reads a DFA or NFA saved with :func:`saveToBinary`
+
+    :param str FileName: file name
+    :rtype: DFA|NFA
+
+    .. versionadded:: 2.2.1"""
+    with MappedFA(FileName) as m:
+        return m.toFA()
+
+
+class MappedFA(object):
+    """ Read-only view of an automaton in the binary format of :func:`toBinary`
+
+    The file is memory-mapped and the transition arrays are used in place, so opening is independent of the size of
+    the automaton. Deterministic automata can be run directly with :meth:`evalWordP`, or materialised with
+    :meth:`toFA`.
+
+    :ivar list Sigma: symbols, by symbol index
+    :ivar int kind: 0 for a DFA, 1 for a NFA
+
+    .. versionadded:: 2.2.1"""
+
+    def __init__(self, FileName):
+        self._buf = None
+        try:
+            # An empty file cannot be mapped: mmap raises ValueError
+            with open(FileName, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._buf = memoryview(self._mm)
+            magic, version, self.kind, _, n, nsym, ntr, nini = _BIN_HEADER.unpack_from(self._buf, 0)
+            if magic != _BIN_MAGIC or version > _BIN_VERSION:
+                raise common.DFAerror("{0:>s} is not a FAdo binary automaton".format(FileName))
+            pos = _BIN_HEADER.size
+            self.Sigma = []
+            for _ in range(nsym):
+                (ln,) = struct.unpack_from("<I", self._buf, pos)
+                self.Sigma.append(str(self._buf[pos + 4:pos + 4 + ln], "utf-8"))
+                pos += 4 + ln
+            pos += -pos % 4
+            self._symi = {x: i for i, x in enumerate(self.Sigma)}
+            self.nStates = n
+            self.initial, pos = self._u32(pos, nini), pos + 4 * nini
+            self._rows, pos = self._u32(pos, n + 1), pos + 4 * (n + 1)
+            self._syms, pos = self._u32(pos, ntr), pos + 4 * ntr
+            self._dests, pos = self._u32(pos, ntr), pos + 4 * ntr
+            self._final = self._buf[pos:pos + (n + 7) // 8]
+        except (struct.error, ValueError):
+            self.close()
+            raise common.DFAerror("{0:>s} is not a FAdo binary automaton".format(FileName))
+        except common.DFAerror:
+            self.close()
+            raise
+
+    def _u32(self, pos, count):
+        v = self._buf[pos:pos + 4 * count]
+        if len(v) != 4 * count:
+            raise ValueError
+        if sys.byteorder == "little" and struct.calcsize("I") == 4:
+            return v.cast("I")
+        a = array("I" if array("I").itemsize == 4 else "L")
+        a.frombytes(v)
+        if sys.byteorder != "little":
+            a.byteswap()
+        return a
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.nStates
+
+    def close(self):
+        """Releases the mapping"""
+        for v in ("initial", "_rows", "_syms", "_dests", "_final"):
+            o = self.__dict__.pop(v, None)
+            if isinstance(o, memoryview):
+                o.release()
+        if self._buf is not None:
+            self._buf.release()
+            self._buf = None
+            self._mm.close()
+
+    def finalP(self, st):
+        """Tests if a state is final
+
+        :param int st: state index
+        :rtype: bool"""
+        return bool(self._final[st >> 3] & (1 << (st & 7)))
+
+    def evalSymbol(self, st, sym):
+        """State reached from a state through a symbol in a DFA
+
+        :param int st: state index
+        :param str sym: symbol
+        :rtype: int | None"""
+        c = self._symi.get(sym)
+        if c is None:
+            return None
+        lo, hi = self._rows[st], self._rows[st + 1]
+        i = bisect_left(self._syms, c, lo, hi)
+        if i < hi and self._syms[i] == c:
+            return self._dests[i]
+        return None
+
+    def evalWordP(self, word):
+        """Verifies if the (deterministic) automaton recognises a given word
+
+        :param word: iterable of symbols
+        :rtype: bool"""
+        if self.kind != _BIN_DFA:
+            raise common.FAdoNotImplemented("evalWordP on a mapped NFA")
+        if not len(self.initial):
+            return False
+        st = self.initial[0]
+        for c in word:
+            st = self.evalSymbol(st, c)
+            if st is None:
+                return False
+        return self.finalP(st)
+
+    def toFA(self):
+        """Builds the corresponding DFA or NFA
+
+        :rtype: DFA|NFA"""
+        nfap = self.kind == _BIN_NFA
+        aut = NFA() if nfap else DFA()
+        aut.States = list(range(self.nStates))
+        aut.Sigma = set(self.Sigma)
+        sigma, rows, syms, dests = self.Sigma, self._rows, self._syms, self._dests
+        delta = aut.delta
+        for s in range(self.nStates):
+            lo, hi = rows[s], rows[s + 1]
+            if lo == hi:
+                continue
+            d = delta[s] = {}
+            for i in range(lo, hi):
+                c = syms[i]
+                c = common.Epsilon if c == _BIN_EPSILON else sigma[c]
+                if nfap:
+                    d.setdefault(c, set()).add(dests[i])
+                else:
+                    d[c] = dests[i]
+        aut.Final = {s for s in range(self.nStates) if self.finalP(s)}
+        if nfap:
+            aut.Initial = set(self.initial)
+        elif len(self.initial):
+            aut.Initial = self.initial[0]
+        return aut
+
+
 def _exportToTeX(FileName, fa):
     """ Saves a finite automatom definition to a latex tabular. Saves a finite automata definition to a file using
     the input format
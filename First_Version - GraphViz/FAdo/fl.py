@@ -264,6 +264,8 @@ class FL(object):
 
         .. versionadded:: 1.3.3
 
+        .. versionchanged:: 2.2.1 register keyed by state signature, replaced states removed in one pass
+
         .. seealso:: Incremental Construction of Minimal Acyclic Finite-State Automata, J.Daciuk, blksz.Mihov, B.Watson and r.E.Watson
 
         :rtype: ADFA"""
@@ -278,15 +280,24 @@ class FL(object):
         i = aut.addState()
         aut.setInitial(i)
         aut.setSigma(self.Sigma)
-        register = set()
+        register = dict()
+        deleted = set()
         foo = sorted(list(self.Words))
         for w in foo:  # sorted(list(self.Words)):
             (cPrefix, lState) = aut._common_prefix(w)
             cSuffix = w[len(cPrefix):]
             if aut.delta.get(lState, {}):
-                aut._replace_or_register(lState, register)
-            aut.addSuffix(lState, cSuffix)
-        aut._replace_or_register(i, register)
+                aut._replace_or_register(lState, register, deleted)
+            # addSuffix without the name collision search of addState: no state is renumbered until the end
+            s1 = lState
+            for c in cSuffix:
+                s2 = len(aut.States)
+                aut.States.append(str(s2))
+                aut.addTransition(s1, c, s2)
+                s1 = s2
+            aut.addFinal(s1)
+        aut._replace_or_register(i, register, deleted)
+        aut.deleteStates(deleted)
         aut.Minimal = True
         return aut
 
@@ -764,36 +775,51 @@ class ADFA(fa.DFA, AFA):
         Returns:
             tuple: pair state index / symbol
 
-        .. versionadded:: 1.3.3"""
-        for c in sorted(list(self.Sigma)).__reversed__():
-            if c in self.delta.get(s, {}):
-                return self.delta[s][c], c
-        raise FAdoGeneralError("Something unexpected in _last_child({:d})".format(s))
+        .. versionchanged:: 2.2.1"""
+        if not self.delta.get(s, {}):
+            raise FAdoGeneralError("Something unexpected in _last_child({:d})".format(s))
+        c = max(self.delta[s])
+        return self.delta[s][c], c
 
-    def _replace_or_register(self, s, r):
-        """to be used by xxx of FL.MADFA
+    def _signature(self, s):
+        """Right language signature of a state whose children are all registered: its finality and its sorted
+        transitions
 
         Args:
             s (int): state index
-            r (set): register (inherited from context)
+        Returns:
+            tuple:
 
-        .. versionadded:: 1.3.3"""
-        (child, c) = self._last_child(s)
-        if self.delta.get(child, {}):
-            self._replace_or_register(child, r)
-        for q in r:
-            if self.statePairEquiv(q, child):
+        .. versionadded:: 2.2.1"""
+        return s in self.Final, tuple(sorted(self.delta.get(s, {}).items()))
+
+    def _replace_or_register(self, s, r, deleted):
+        """to be used by xxx of FL.MADFA
+
+        Args:
+            s (int): state index
+            r (dict): register, from state signature to state index (inherited from context)
+            deleted (set): states replaced by equivalent ones; they are only detached from their parent and must be
+                removed afterwards with deleteStates
+
+        .. versionchanged:: 2.2.1"""
+        path = []
+        while self.delta.get(s, {}):
+            (child, c) = self._last_child(s)
+            path.append((s, c, child))
+            s = child
+        for (s, c, child) in reversed(path):
+            q = r.setdefault(self._signature(child), child)
+            if q != child:
                 self.delta[s][c] = q
-                self.deleteState(child)
-                return
-        r.add(child)
+                deleted.add(child)
 
     def _common_prefix(self, wrd):
         """The longest prefix of w that can be read in the ADFA and the correspondent state
 
         Args:
             wrd (Word): the word """
-        pref = Word()
+        pref = []
         q = self.Initial
         for s in wrd:
             if s in self.delta.get(q, {}):
@@ -801,7 +827,7 @@ class ADFA(fa.DFA, AFA):
                 q = self.delta[q][s]
             else:
                 break
-        return pref, q
+        return Word(pref), q
 
     def _addWordToMinimal(self, w):
         """Incremental minimization algorithm
@@ -1133,11 +1159,11 @@ class RndWGen(object):
         """Next word
 
         :return: a new random word"""
-        word = Word()
+        word = []
         s = self.aut.Initial
         while True:
             if self.aut.finalP(s) and random.randint(1, self.table[s][None] + 1) == 1:
-                return word
+                return Word(word)
             i = self._rndChoose([self.table[s].get(c, 0) for c in self.Sigma])
             word.append(self.Sigma[i])
             s = self.aut.delta[s][self.Sigma[i]]
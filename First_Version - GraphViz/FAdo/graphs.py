@@ -169,3 +169,128 @@ class DiGraphVm(DiGraph):
 
         :param int v: vertex"""
         self.MarkedV.add(v)
+
+
+def stronglyConnectedComponents(n, successors, roots=None):
+    """Strongly connected components of a graph on the vertices 0..n-1, by Tarjan's algorithm with an explicit
+    stack (no recursion, whatever the size of the graph)
+
+    :param int n: number of vertices
+    :param successors: adjacency list, successors[v] is the iterable of successors of v; successors outside
+        0..n-1 are ignored
+    :param roots: vertices to start the search from, all of them by default; only the components reachable
+        from the roots are returned
+    :return: the components as lists of vertices, in reverse topological order: every component comes after all
+        the components it reaches. Each list ends with the vertex of the component reached first.
+    :rtype: list
+
+    .. versionadded:: 2.2.1"""
+    index = [-1] * n
+    low = [0] * n
+    onStack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+    for root in range(n) if roots is None else roots:
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        onStack[root] = True
+        work = [(root, iter(successors[root]))]
+        while work:
+            v, it = work[-1]
+            for w in it:
+                if not 0 <= w < n:
+                    continue
+                if index[w] < 0:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    onStack[w] = True
+                    work.append((w, iter(successors[w])))
+                    break
+                if onStack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        onStack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(component)
+    return components
+
+
+def topologicalSort(n, successors, roots=None):
+    """Vertices of a graph on 0..n-1 in reverse postorder of a depth first search with an explicit stack: a
+    topological order when the graph is acyclic
+
+    :param int n: number of vertices
+    :param successors: adjacency list, successors[v] is the iterable of successors of v
+    :param roots: vertices to start the search from, in this order; all of them by default
+    :return: the vertices reached from the roots
+    :rtype: list
+
+    .. versionadded:: 2.2.1"""
+    visited = [False] * n
+    postorder = []
+    for root in range(n) if roots is None else roots:
+        if visited[root]:
+            continue
+        visited[root] = True
+        work = [(root, iter(successors[root]))]
+        while work:
+            v, it = work[-1]
+            for w in it:
+                if 0 <= w < n and not visited[w]:
+                    visited[w] = True
+                    work.append((w, iter(successors[w])))
+                    break
+            else:
+                work.pop()
+                postorder.append(v)
+    postorder.reverse()
+    return postorder
+
+
+def acyclicP(n, successors):
+    """Whether a graph on 0..n-1 has no cycle (a self loop is a cycle), by a depth first search with an explicit
+    stack
+
+    :param int n: number of vertices
+    :param successors: adjacency list, successors[v] is the iterable of successors of v
+    :rtype: bool
+
+    .. versionadded:: 2.2.1"""
+    # 0 not visited, 1 on the current path, 2 done
+    colour = [0] * n
+    for root in range(n):
+        if colour[root]:
+            continue
+        colour[root] = 1
+        work = [(root, iter(successors[root]))]
+        while work:
+            v, it = work[-1]
+            for w in it:
+                if not 0 <= w < n:
+                    continue
+                if colour[w] == 1:
+                    return False
+                if not colour[w]:
+                    colour[w] = 1
+                    work.append((w, iter(successors[w])))
+                    break
+            else:
+                work.pop()
+                colour[v] = 2
+    return True
@@ -68,7 +68,7 @@ import lark
 # from lark import Lark
 # from itertools import chain, combinations
 from collections import deque
-from .unionFind import UnionFind
+from .unionFind import IndexedUnionFind
 from .common import *
 from .common import EmptySet
 
@@ -853,9 +853,14 @@ class RegExp(RegularExpression):
         Args:
             word (str): the word
         Returns:
-             bool: True if word belongs to the language"""
+             bool: True if word belongs to the language
 
-        return self.wordDerivative(word).ewp()
+        .. versionchanged:: 2.2.1 runs the shared DerivativeMatcher, which caches the derivatives it computes"""
+        found = _derivativeMatcher.evalWordP(self, word)
+        if found is None:
+            # Complements, conjunctions, shuffles, ... are not cached: one derivative per symbol, as before
+            return self.wordDerivative(word).ewp()
+        return found
 
     def compare(self, r, cmp_method="compareMinimalDFA", nfa_method="nfaPD"):
         """Compare with another regular expression for equivalence.
@@ -1013,7 +1018,7 @@ class RegExp(RegularExpression):
             return False
         i1 = frozenset([self])
         i2 = frozenset([other])
-        s = UnionFind(auto_create=True)
+        s = IndexedUnionFind(auto_create=True)
         s.union(i1, i2)
         stack = [(i1, i2)]
         while stack:
@@ -6034,6 +6039,166 @@ class DAG_I(DAG):
                 return True
         return False
 
+
+class DerivativeMatcher(object):
+    """Lazily built word derivatives automaton, shared by the membership tests of all regular expressions
+
+    States are derivatives brought to a normal form (reduced, with disjunctions flattened, deduplicated and sorted),
+    and interned by their representation, so equal derivatives of different words, or of different expressions, are
+    one state. A transition is computed the first time some word takes it, and is a dictionary lookup afterwards:
+    the automaton is the part of the one of dfaBrzozowski that the inputs actually visit. Because the normal form
+    identifies disjunctions up to associativity, commutativity and idempotence, an expression has finitely many
+    states. Options are written as disjunctions with the empty word; expressions with other operators (complements,
+    conjunctions, shuffles, ...) have no normal form and are left to :meth:`RegExp.wordDerivative`, so they never
+    enter the table. When max_states is reached the table is emptied and grows again from the current state.
+
+    .. seealso:: J. A. Brzozowski, Derivatives of Regular Expressions. J. ACM 11(4): 481-494 (1964)
+
+    .. versionadded:: 2.2.1"""
+    def __init__(self, max_states=10000):
+        self.max_states = max_states
+        self.index = dict()
+        self.states = []
+        self.final = []
+        self.delta = []
+
+    def __len__(self):
+        return len(self.states)
+
+    def clear(self):
+        """Forgets every state and transition"""
+        self.index = dict()
+        self.states = []
+        self.final = []
+        self.delta = []
+
+    def _state(self, reg):
+        key = repr(reg)
+        i = self.index.get(key)
+        if i is None:
+            final = reg.ewp()
+            i = len(self.states)
+            self.states.append(reg)
+            self.final.append(final)
+            self.delta.append(dict())
+            self.index[key] = i
+        return i
+
+    def stateOf(self, reg):
+        """State of a regular expression, added if needed
+
+        Args:
+            reg (RegExp): regular expression
+        Returns:
+            int: state index, or None if the expression has operators without normal form"""
+        reg = _normalForm(reg)
+        if reg is None:
+            return None
+        if len(self.states) >= self.max_states:
+            self.clear()
+        return self._state(reg)
+
+    def evalWordP(self, reg, word):
+        """Whether a word is in the language of a regular expression
+
+        Args:
+            reg (RegExp): regular expression
+            word: iterable of symbols
+        Returns:
+            bool: True if word belongs to the language, None if the expression has operators without normal form"""
+        i = self.stateOf(reg)
+        if i is None:
+            return None
+        delta = self.delta
+        for sym in word:
+            j = delta[i].get(sym)
+            if j is None:
+                state = self.states[i]
+                if len(self.states) >= self.max_states:
+                    self.clear()
+                    i = self._state(state)
+                    delta = self.delta
+                j = self._state(_normalForm(state.derivative(sym)))
+                delta[i][sym] = j
+            i = j
+        return self.final[i]
+
+
+def _normalForm(reg):
+    """Reduced regular expression with its options written as disjunctions with the empty word, its disjunctions
+    flattened, without repetitions, and sorted
+
+    Args:
+        reg (RegExp): regular expression
+    Returns:
+        RegExp: equivalent regular expression, None if it has nodes other than atoms, constants, disjunctions,
+        concatenations, stars and options, whose reduced() is not complete"""
+    reg = _withoutOptions(reg)
+    if reg is None:
+        return None
+    return _aciDisj(reg.reduced())
+
+
+def _withoutOptions(reg):
+    t = type(reg)
+    if t is CAtom or t is CEpsilon or t is CEmptySet:
+        return reg
+    elif t is CDisj or t is CConcat:
+        left, right = _withoutOptions(reg.arg1), _withoutOptions(reg.arg2)
+        if left is None or right is None:
+            return None
+        if left is reg.arg1 and right is reg.arg2:
+            return reg
+        return t(left, right, reg.Sigma)
+    elif t is CStar:
+        arg = _withoutOptions(reg.arg)
+        if arg is None:
+            return None
+        if arg is reg.arg:
+            return reg
+        return CStar(arg, reg.Sigma)
+    elif t is COption:
+        arg = _withoutOptions(reg.arg)
+        if arg is None:
+            return None
+        return CDisj(CEpsilon(reg.Sigma), arg, reg.Sigma)
+    return None
+
+
+def _aciDisj(reg):
+    t = type(reg)
+    if t is CDisj:
+        args = dict()
+        stack = [reg]
+        while stack:
+            r = stack.pop()
+            if type(r) is CDisj:
+                stack.append(r.arg2)
+                stack.append(r.arg1)
+            else:
+                r = _aciDisj(r)
+                args.setdefault(repr(r), r)
+        keys = sorted(args)
+        new = args[keys[-1]]
+        for key in reversed(keys[:-1]):
+            new = CDisj(args[key], new, reg.Sigma)
+        return new.reduced()
+    elif t is CConcat:
+        left, right = _aciDisj(reg.arg1), _aciDisj(reg.arg2)
+        if left is reg.arg1 and right is reg.arg2:
+            return reg
+        return CConcat(left, right, reg.Sigma)
+    elif t is CStar:
+        arg = _aciDisj(reg.arg)
+        if arg is reg.arg:
+            return reg
+        return CStar(arg, reg.Sigma)
+    return reg
+
+
+_derivativeMatcher = DerivativeMatcher()
+
+
 class BuildRegexp(lark.Transformer):
     """ Semantics of the FAdo grammars' regexps
         Priorities of operators: disj > conj > shuffle > concat > not > star >= option
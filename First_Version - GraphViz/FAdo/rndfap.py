@@ -27,12 +27,55 @@ ICDFA Random generation binding
   along with this program; if not, write to the Free Software
   Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA."""
 
+import multiprocessing as mp
 import random
 import time
+from functools import lru_cache
 from . import common
 from . import fa
 
 
+@lru_cache(maxsize=8)
+def _tables(n, k):
+    """Counting tables for ICDFAs with n states over k symbols, shared by all the generators with the same (n, k)
+
+    ``N[(m, i)]`` is the number of string representations whose flag for state ``m`` is at position ``i``;
+    ``S[(m, l)]`` is the weighted suffix sum that :meth:`ICDFArgen._getFlag` draws from, sum of
+    ``m ** (i - l) * N[(m, i)]`` for ``l <= i < m * k``, so each draw costs no more than the flags it skips.
+
+    :rtype: tuple"""
+    N = dict()
+    foo = n ** k
+    for j in range((n - 1) * k - 1, n - 3, -1):
+        N[(n - 1, j)] = foo
+        foo *= n
+    for m in range(n - 2, 0, -1):
+        foo = 0
+        bar = 1
+        m1 = m + 1
+        for i in range(0, k):
+            foo += bar * N[(m + 1, m * k + i)]
+            bar *= m1
+        N[(m, m * k - 1)] = foo
+        for i in range(m * k - 2, m - 2, -1):
+            N[(m, i)] = m1 * N[(m, i + 1)] + N[(m + 1, i + 1)]
+    S = dict()
+    for m in range(1, n):
+        foo = 0
+        for l in range(m * k - 1, m - 3, -1):
+            if (m, l) not in N:
+                break
+            foo = N[(m, l)] + m * foo
+            S[(m, l)] = foo
+    return N, S
+
+
+def _batch(n, k, pn, seed, count):
+    """Worker of :meth:`ICDFArgen.generate_batch`"""
+    g = ICDFArgen(n, k, True, pn, seed)
+    return [next(g) for _ in range(count)]
+
+
 class ICDFArgen(object):
     """Generic ICDFA random generator class
 
@@ -44,10 +87,12 @@ class ICDFArgen(object):
     .. seealso:: Marco Almeida, Nelma Moreira, and Rogério Reis. Enumeration and generation with a string automata
        representation. Theoretical Computer Science, 387(2):93-102, 2007
 
-    .. versionchanged:: 1.3.4 seed added to the random generator"""
+    .. versionchanged:: 1.3.4 seed added to the random generator
+
+    .. versionchanged:: 2.2.1 counting tables computed once per (n, k) and each generator has its own
+       ``random.Random`` instance instead of reseeding the ``random`` module"""
 
     def __init__(self, n, k, nd=False, pn=1, seed=0):
-        self.N = dict()
         self.n = n
         self.k = k
         if seed != 0:
@@ -57,25 +102,12 @@ class ICDFArgen(object):
                 self.seed = hash(time.clock_gettime_ns(time.CLOCK_MONOTONIC_RAW))
             else:
                 self.seed = hash( time.perf_counter())
-        foo = n ** k
-        random.seed(self.seed)
+        self.random = random.Random(self.seed)
         if not nd:
             self.pn = 0
         else:
             self.pn = pn
-        for j in range((n - 1) * k - 1, n - 3, -1):
-            self.N[(n - 1, j)] = foo
-            foo *= n
-        for m in range(n - 2, 0, -1):
-            foo = 0
-            bar = 1
-            m1 = m + 1
-            for i in range(0, k):
-                foo += bar * self.N[(m + 1, m * k + i)]
-                bar *= m1
-            self.N[(m, m * k - 1)] = foo
-            for i in range(m * k - 2, m - 2, -1):
-                self.N[(m, i)] = m1 * self.N[(m, i + 1)] + self.N[(m + 1, i + 1)]
+        self.N, self._S = _tables(n, k)
 
     def __iter__(self):
         return self
@@ -85,28 +117,23 @@ class ICDFArgen(object):
 
         :rtype: list
         """
-        return [random.randint(0, 1) for _ in range(self.n)]
+        return [self.random.randint(0, 1) for _ in range(self.n)]
 
     def _getFlag(self, m, l):
-        k = self.k
+        N = self.N
+        r = self.random.randint(0, self._S[(m, l)])
         bar = 1
-        foo = 0
-        for i in range(l, m * k):
-            foo += bar * self.N[(m, i)]
-            bar *= m
-        r = random.randint(0, foo)
-        bar = 1
-        for i in range(l, m * k):
-            foo = bar * self.N[(m, i)]
+        for i in range(l, m * self.k):
+            foo = bar * N[(m, i)]
             if r < foo:
                 return i
             else:
                 r -= foo
                 bar *= m
-        return m * k - 1
+        return m * self.k - 1
 
     def _rndT(self, i):
-        r = random.randint(0, i + self.pn - 1)
+        r = self.random.randint(0, i + self.pn - 1)
         if r < self.pn:
             return -1
         else:
@@ -130,6 +157,28 @@ class ICDFArgen(object):
     def next(self):
         return self.__next__()
 
+    def generate_batch(self, count, workers=None):
+        """ Generate a list of ICDFAs, possibly in parallel
+
+        Each worker process runs its own generator, seeded from this one, so a batch is reproducible for a given
+        seed and number of workers.
+
+        :param int count: number of automata
+        :param int workers: number of processes (default: one per CPU); 1 generates in this process
+        :rtype: list
+
+        .. versionadded:: 2.2.1"""
+        if workers is None:
+            workers = mp.cpu_count()
+        if workers <= 1 or count < 2:
+            return [next(self) for _ in range(count)]
+        workers = min(workers, count)
+        jobs = [(self.n, self.k, self.pn, self.random.getrandbits(63) | 1, count // workers + (i < count % workers))
+                for i in range(workers)]
+        with mp.Pool(workers) as pool:
+            batches = pool.starmap(_batch, jobs)
+        return [d for b in batches for d in b]
+
 class ICDFArnd(ICDFArgen):
     """ Complete ICDFA random generator class
 
@@ -25,6 +25,8 @@
    along with this program; if not, write to the Free Software
    Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA."""
 
+from array import array
+
 
 class UnionFind:
     """ Classical Union/Find data structure """
@@ -49,18 +51,26 @@ class UnionFind:
                 self.rank[y] += 1
 
     def find(self, x):
+        """Representative of the set of x, compressing the path to it
+
+        .. versionchanged:: 2.2.1 iterative, long parent chains no longer hit the recursion limit"""
+        p = self.p
         try:
-            if x != self.p[x]:
-                self.p[x] = self.find(self.p[x])
+            root = p[x]
         except KeyError:
             if self.auto_create:
                 # this should be a call to self.make_set(x);
                 # function calls, however, are *very* expensive and
                 # this piece of repeated code runs almost 50%
                 # faster...
-                self.p[x] = x
+                p[x] = x
                 self.rank[x] = 0
-        return self.p[x]
+            return p[x]
+        while root != p[root]:
+            root = p[root]
+        while x != root:
+            p[x], x = root, p[x]
+        return root
 
     def copy(self):
         """ Duplicates the internal structure (deepcopy is too expensive) """
@@ -87,6 +97,108 @@ class UnionFind:
                 d[foo] = [i]
         return d
 
+class IndexedUnionFind:
+    """Union/Find over keys interned to dense integers, with the same interface as UnionFind
+
+    Parents and ranks are kept in ``array('i')`` indexed by the number of each key, so large keys (such as the
+    frozensets of subset constructions) are hashed once per lookup and never compared along a path. Paths are
+    compressed iteratively, and every representative keeps the list of the members of its set, so that
+    get_set is linear in the size of the set.
+
+    .. versionadded:: 2.2.1"""
+    def __init__(self, auto_create=False):
+        self.index = {}
+        self.keys = []
+        self.parent = array('i')
+        self.rank = array('i')
+        self.members = []
+        self.auto_create = auto_create
+
+    def _new(self, x):
+        i = len(self.keys)
+        self.index[x] = i
+        self.keys.append(x)
+        self.parent.append(i)
+        self.rank.append(0)
+        self.members.append([i])
+        return i
+
+    def make_set(self, x):
+        # a key that is already known stays in its set
+        if x not in self.index:
+            self._new(x)
+
+    def _root(self, i):
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def _lookup(self, x):
+        try:
+            return self.index[x]
+        except KeyError:
+            if self.auto_create:
+                return self._new(x)
+            raise
+
+    def find(self, x):
+        return self.keys[self._root(self._lookup(x))]
+
+    def union(self, x, y):
+        self._link(self._root(self._lookup(x)), self._root(self._lookup(y)))
+
+    def link(self, x, y):
+        self._link(self.index[x], self.index[y])
+
+    def _link(self, x, y):
+        # same choice of representative as UnionFind.link, including the rank bump when x is y
+        rank = self.rank
+        if rank[x] > rank[y]:
+            self.parent[y] = x
+            root, child = x, y
+        else:
+            self.parent[x] = y
+            if rank[x] == rank[y]:
+                rank[y] += 1
+            root, child = y, x
+        if x == y:
+            return
+        # move the shorter member list into the longer one
+        members = self.members
+        if len(members[root]) < len(members[child]):
+            members[root], members[child] = members[child], members[root]
+        members[root].extend(members[child])
+        members[child] = None
+
+    def copy(self):
+        """ Duplicates the internal structure """
+        copy = IndexedUnionFind(self.auto_create)
+        copy.index = self.index.copy()
+        copy.keys = self.keys[:]
+        copy.parent = array('i', self.parent)
+        copy.rank = array('i', self.rank)
+        copy.members = [None if m is None else m[:] for m in self.members]
+        return copy
+
+    def get_set(self, x):
+        """Return the set with all
+        :param x: value
+        :rtype: list"""
+        i = self.index.get(x)
+        if i is None or self.parent[i] != i:
+            return []
+        return [self.keys[j] for j in self.members[i]]
+
+    def get_sets(self):
+        """ Return the sets we have (list of sets)"""
+        return {self.keys[i]: [self.keys[j] for j in m] for i, m in enumerate(self.members)
+                if m is not None and self.parent[i] == i}
+
+
 if __name__ == "__main__":
     N = 10
     s = UnionFind()
@@ -1,12 +1,17 @@
 from FAdo.fa import *  # Import FAdo automata library
+from FAdo.common import DFAbudgetExceeded
 from RGX_NFA import regex_to_nfa  # Import regex-to-NFA function
 #test
-def nfa_to_dfa(nfa):
+def nfa_to_dfa(nfa, **limits):
     try:
-        # Convert the NFA to DFA (no minimization)
-        dfa = nfa.toDFA()
+        # Convert the NFA to DFA (no minimization); limits are maxStates, maxTransitions
+        # and timeout, going over one raises DFAbudgetExceeded
+        dfa = nfa.toDFA(**limits)
         
         return dfa
+    except DFAbudgetExceeded:
+        # Let the caller report which limit was hit
+        raise
     except Exception as e:
         print(f"Error during NFA to DFA conversion: {e}")
         return None
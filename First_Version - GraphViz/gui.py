@@ -1,9 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox, scrolledtext, simpledialog
-import random
 import subprocess #open our default file viewer
 import os #for handling os systems
-import itertools #used for generating possible combinations from a string
 
 from FAdo.reex import str2regexp
 from FAdo.fa import *
@@ -11,6 +9,12 @@ from FAdo.fa import *
 from NFA_DFA import nfa_to_dfa
 from RGX_NFA import regex_to_nfa 
 from DFA_MIN import minimize_dfa
+from DFA_CACHE import DiskCache, cached_min_dfa
+from DFA_SAMPLE import WordSampler
+
+# Subset construction limits, so a regex with an exponential DFA cannot freeze the window
+COMPILE_LIMITS = {"maxStates": 2000, "maxTransitions": 50000, "timeout": 10}
+
 def regex_to_nfa(regex):
     try:
         # Parse the regex into a FAdo regex object
@@ -118,7 +122,13 @@ class DFAScannerApp:
 
         # Class variables
         self.minimized_dfa = None
+        self.sampler = None
         self.alphabet = set()
+        try:
+            self.compile_cache = DiskCache()
+        except OSError:
+            # Cache directory not writable, compile every time
+            self.compile_cache = None
 
     def convert_to_min_dfa(self):
         # Clear previous results
@@ -134,47 +144,40 @@ class DFAScannerApp:
         regex = self.regex_entry.get()
 
         try:
-            # Generate NFA from regex using the custom function
-            nfa = regex_to_nfa(regex)
-
-            if nfa:
-                # Convert NFA to DFA using the custom function
-                dfa = nfa_to_dfa(nfa)
-
-                if dfa:
-                    # Minimize the DFA using the custom function
-                    minimized_dfa = minimize_dfa(dfa)
-                    self.minimized_dfa = minimized_dfa
-
-                    # Determine alphabet
-                    self.alphabet = set(
-                        symbol
-                        for state in minimized_dfa.delta
-                        for symbol in minimized_dfa.delta[state].keys()
-                    )
-
-                    # Display DFA Information
-                    self.info_text.insert(tk.END, f"Minimized DFA for Regex: {regex}\n\n")
-                    self.info_text.insert(tk.END, f"States: {minimized_dfa.States}\n")
-                    self.info_text.insert(tk.END, f"Initial State: {minimized_dfa.Initial}\n")
-                    self.info_text.insert(tk.END, f"Final States: {minimized_dfa.Final}\n\n")
-
-                    self.info_text.insert(tk.END, "Transitions:\n")
-                    for state in minimized_dfa.delta:
-                        for symbol, next_state in minimized_dfa.delta[state].items():
-                            self.info_text.insert(
-                                tk.END, f"{state} --{symbol}--> {next_state}\n"
-                            )
-
-                    # Enable buttons
-                    self.show_graph_btn.config(state=tk.NORMAL)
-                    self.test_code_btn.config(state=tk.NORMAL)
-                    self.generate_code_btn.config(state=tk.NORMAL)
-
-                else:
-                    messagebox.showerror("Error", "Failed to convert NFA to DFA")
+            # Regex -> NFA -> DFA -> minimal DFA, reusing the on-disk cache when possible
+            minimized_dfa = cached_min_dfa(regex, self.compile_cache, **COMPILE_LIMITS)
+
+            if minimized_dfa:
+                self.minimized_dfa = minimized_dfa
+                self.sampler = WordSampler(minimized_dfa)
+
+                # Determine alphabet
+                self.alphabet = set(
+                    symbol
+                    for state in minimized_dfa.delta
+                    for symbol in minimized_dfa.delta[state].keys()
+                )
+
+                # Display DFA Information
+                self.info_text.insert(tk.END, f"Minimized DFA for Regex: {regex}\n\n")
+                self.info_text.insert(tk.END, f"States: {minimized_dfa.States}\n")
+                self.info_text.insert(tk.END, f"Initial State: {minimized_dfa.Initial}\n")
+                self.info_text.insert(tk.END, f"Final States: {minimized_dfa.Final}\n\n")
+
+                self.info_text.insert(tk.END, "Transitions:\n")
+                for state in minimized_dfa.delta:
+                    for symbol, next_state in minimized_dfa.delta[state].items():
+                        self.info_text.insert(
+                            tk.END, f"{state} --{symbol}--> {next_state}\n"
+                        )
+
+                # Enable buttons
+                self.show_graph_btn.config(state=tk.NORMAL)
+                self.test_code_btn.config(state=tk.NORMAL)
+                self.generate_code_btn.config(state=tk.NORMAL)
+
             else:
-                messagebox.showerror("Error", "Failed to generate NFA from regex")
+                messagebox.showerror("Error", "Failed to generate a minimized DFA from regex")
 
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -265,12 +268,12 @@ class DFAScannerApp:
 
         # Generate random accepted codes
         self.results_text.insert(tk.END, f"Random Accepted Codes (Length {length}):\n")
-        for _ in range(5):
-            random_code = self.generate_random_accepted_string(length)
-            if random_code:
+        random_codes = self.sampler.sample_many(length, 5)
+        if random_codes:
+            for random_code in random_codes:
                 self.results_text.insert(tk.END, random_code + "\n")
-            else:
-                self.results_text.insert(tk.END, "No random codes generated.\n")
+        else:
+            self.results_text.insert(tk.END, "No random codes generated.\n")
 
         # Enumerate all accepted codes
         self.results_text.insert(tk.END, f"\nEnumerated Accepted Codes (Length {length}):\n")
@@ -283,43 +286,16 @@ class DFAScannerApp:
 
 
     def generate_random_accepted_string(self, length):
-        if not self.minimized_dfa or length <= 0:
+        # Uniform over the accepted codes of this length, None if there are none
+        if not self.minimized_dfa:
             return None
-
-        for _ in range(100):  # Attempt up to 100 times to find a valid string
-            current_state = self.minimized_dfa.Initial
-            generated_string = ""
-
-            for _ in range(length):
-                # Check if there are valid transitions from the current state
-                if current_state not in self.minimized_dfa.delta or not self.minimized_dfa.delta[current_state]:
-                    break  # No valid transitions, abandon this attempt
-
-                # Choose a random valid transition
-                valid_transitions = list(self.minimized_dfa.delta[current_state].items())
-                symbol, next_state = random.choice(valid_transitions)
-                generated_string += symbol
-                current_state = next_state
-
-            # Verify the string ends in a final state
-            if current_state in self.minimized_dfa.Final:
-                return generated_string
-
-        # If no valid string is found after 100 attempts, return None
-        return None
-
-
+        return self.sampler.sample(length)
 
     def generate_enumerated_codes(self, length):
-        if not self.minimized_dfa or not self.alphabet:
+        # Walks the DFA along prefixes that still lead to an accepted code
+        if not self.minimized_dfa:
             return []
-
-        codes = []
-        for code in itertools.product(self.alphabet, repeat=length):
-            code_str = ''.join(code)
-            if self.test_string_acceptance(code_str):
-                codes.append(code_str)
-        return codes
+        return list(self.sampler.words(length))
 
 
     def test_string_acceptance(self, test_string):
@@ -0,0 +1,92 @@
+import time
+
+
+class BudgetExceeded(Exception):
+    """Raised when building the NFA or determinising it goes over a CompileBudget.
+
+    limit is the name of the limit that was hit ('max_nfa_states', 'max_states', 'max_transitions'
+    or 'timeout'), value its setting, and stats the partial statistics of the construction when it
+    was stopped (dfa_states, transitions, pending_states, nfa_states, elapsed seconds).
+    """
+
+    def __init__(self, limit, value, stats):
+        self.limit = limit
+        self.value = value
+        self.stats = stats
+        if not stats['dfa_states']:
+            # Stopped while the NFA was being built
+            super().__init__(f"NFA construction exceeded {limit}={value} "
+                             f"({stats['nfa_states']} states, {stats['elapsed']:.2f} s)")
+        else:
+            super().__init__(f"DFA construction exceeded {limit}={value} "
+                             f"({stats['dfa_states']} states, {stats['transitions']} transitions, "
+                             f"{stats['elapsed']:.2f} s)")
+
+
+class CompileCancelled(Exception):
+    """Raised when determinisation is stopped through the cancelled event of its CompileBudget."""
+
+
+class CompileBudget:
+    """Limits on the compilation: number of DFA states, number of transitions, number of NFA
+    states made by counted repetitions and wall-clock time in seconds. None means unlimited.
+
+    The limits are checked as the automata grow, so a construction is stopped within one DFA
+    state (and its outgoing transitions), or one copy of a repeated sub-NFA, of the limit. The
+    time limit covers both constructions when they share one start(). The same checks raise
+    CompileCancelled once the optional cancelled event (a threading.Event) is set.
+    """
+
+    def __init__(self, max_states=None, max_transitions=None, timeout=None, cancelled=None,
+                 max_nfa_states=None):
+        self.max_states = max_states
+        self.max_transitions = max_transitions
+        self.timeout = timeout
+        self.cancelled = cancelled
+        self.max_nfa_states = max_nfa_states
+
+    def cancellable(self, cancelled):
+        # Same limits, stopped when the event is set
+        return CompileBudget(self.max_states, self.max_transitions, self.timeout, cancelled,
+                             self.max_nfa_states)
+
+    def start(self):
+        return time.monotonic()
+
+    def check_nfa(self, started, nfa_states):
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise CompileCancelled()
+        elapsed = time.monotonic() - started
+        if self.max_nfa_states is not None and nfa_states > self.max_nfa_states:
+            limit, value = 'max_nfa_states', self.max_nfa_states
+        elif self.timeout is not None and elapsed > self.timeout:
+            limit, value = 'timeout', self.timeout
+        else:
+            return
+        raise BudgetExceeded(limit, value, {
+            'dfa_states': 0,
+            'transitions': 0,
+            'pending_states': 0,
+            'nfa_states': nfa_states,
+            'elapsed': elapsed,
+        })
+
+    def check(self, started, dfa_states, transitions, pending_states, nfa_states):
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise CompileCancelled()
+        elapsed = time.monotonic() - started
+        if self.max_states is not None and dfa_states > self.max_states:
+            limit, value = 'max_states', self.max_states
+        elif self.max_transitions is not None and transitions > self.max_transitions:
+            limit, value = 'max_transitions', self.max_transitions
+        elif self.timeout is not None and elapsed > self.timeout:
+            limit, value = 'timeout', self.timeout
+        else:
+            return
+        raise BudgetExceeded(limit, value, {
+            'dfa_states': dfa_states,
+            'transitions': transitions,
+            'pending_states': pending_states,
+            'nfa_states': nfa_states,
+            'elapsed': elapsed,
+        })
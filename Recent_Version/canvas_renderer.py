@@ -0,0 +1,161 @@
+import shlex
+import tkinter as tk
+
+# Graphviz 'plain' coordinates are in inches; one inch is drawn as this many canvas units at zoom 1
+POINTS_PER_INCH = 72
+FONT_FAMILY = 'Arial'
+# Graphviz lays labels out with 14 pt Times; Arial at 10 fits the same boxes
+FONT_SIZE = 10
+# Gap between the two rings of a doublecircle, in canvas units at zoom 1
+DOUBLE_CIRCLE_GAP = 4
+HIGHLIGHT_COLOR = 'red'
+
+
+def parse_plain(text):
+    """Layout of a graph from Graphviz 'plain' output.
+
+    Returns a dict with the graph width and height in inches, nodes (name to a dict of
+    x, y, width, height, label, shape, color) and edges (a list of dicts with tail, head,
+    points, label, label_pos and color). Coordinates are in inches from the bottom left
+    corner, as Graphviz gives them; points are the control points of the edge's cubic
+    B-spline.
+    """
+    layout = {'width': 0.0, 'height': 0.0, 'nodes': {}, 'edges': []}
+    for line in text.splitlines():
+        fields = shlex.split(line)
+        if not fields:
+            continue
+        kind = fields[0]
+        if kind == 'graph':
+            layout['width'], layout['height'] = float(fields[2]), float(fields[3])
+        elif kind == 'node':
+            name, x, y, width, height, label, _style, shape, color = fields[1:10]
+            layout['nodes'][name] = {
+                'x': float(x), 'y': float(y), 'width': float(width), 'height': float(height),
+                'label': label.replace('\\n', '\n'), 'shape': shape, 'color': color,
+            }
+        elif kind == 'edge':
+            tail, head, n = fields[1], fields[2], int(fields[3])
+            coords = [float(value) for value in fields[4:4 + 2 * n]]
+            rest = fields[4 + 2 * n:]
+            # An edge line ends with [label xl yl] style color
+            label, label_pos = None, None
+            if len(rest) >= 5:
+                label, label_pos = rest[0], (float(rest[1]), float(rest[2]))
+            layout['edges'].append({
+                'tail': tail, 'head': head, 'points': list(zip(coords[::2], coords[1::2])),
+                'label': label, 'label_pos': label_pos, 'color': rest[-1],
+            })
+        elif kind == 'stop':
+            break
+    return layout
+
+
+class CanvasRenderer:
+    """Draws a Graphviz layout as native Canvas items.
+
+    The layout is computed once per graph; highlighting recolours the items of a state and
+    of an edge, and zooming scales the items in place, so neither runs Graphviz again. Nodes
+    are tagged 'node:<name>' and edges 'edge:<tail>:<head>', for both shapes and labels.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.layout = None
+        self.zoom = 1.0
+        self.highlighted = []
+        self.edge_colors = {}
+
+    def draw(self, layout, zoom=None):
+        # zoom None fits the whole graph in the visible canvas
+        self.canvas.delete('all')
+        self.layout = layout
+        self.highlighted = []
+        self.edge_colors = {}
+        if zoom is None:
+            zoom = self.fit_zoom()
+        self.zoom = zoom
+
+        height = layout['height']
+
+        def point(x, y):
+            # Graphviz puts the origin at the bottom left, the canvas at the top left
+            return x * POINTS_PER_INCH * zoom, (height - y) * POINTS_PER_INCH * zoom
+
+        for edge in layout['edges']:
+            tag = f"edge:{edge['tail']}:{edge['head']}"
+            self.edge_colors[tag] = edge['color']
+            coords = [c for x, y in edge['points'] for c in point(x, y)]
+            # The points are Bezier knots and control points, which is what smooth='raw' draws
+            self.canvas.create_line(*coords, smooth='raw', arrow=tk.LAST, fill=edge['color'],
+                                    tags=(tag, 'edge', 'shape'))
+            if edge['label'] is not None:
+                self.canvas.create_text(*point(*edge['label_pos']), text=edge['label'], font=self.font(),
+                                        tags=(tag, 'edge', 'label'))
+
+        for name, node in layout['nodes'].items():
+            tag = f"node:{name}"
+            x, y = point(node['x'], node['y'])
+            rx = node['width'] * POINTS_PER_INCH * zoom / 2
+            ry = node['height'] * POINTS_PER_INCH * zoom / 2
+            self.canvas.create_oval(x - rx, y - ry, x + rx, y + ry, outline=node['color'], fill='white',
+                                    tags=(tag, 'node', 'shape'))
+            if node['shape'] == 'doublecircle':
+                gap = DOUBLE_CIRCLE_GAP * zoom
+                self.canvas.create_oval(x - rx + gap, y - ry + gap, x + rx - gap, y + ry - gap,
+                                        outline=node['color'], tags=(tag, 'node', 'shape'))
+            self.canvas.create_text(x, y, text=node['label'], font=self.font(), tags=(tag, 'node', 'label'))
+
+        self.update_scrollregion()
+
+    def fit_zoom(self):
+        width = self.layout['width'] * POINTS_PER_INCH
+        height = self.layout['height'] * POINTS_PER_INCH
+        if not width or not height:
+            return 1.0
+        return min(self.canvas.winfo_width() / width, self.canvas.winfo_height() / height)
+
+    def font(self):
+        return FONT_FAMILY, max(1, round(FONT_SIZE * self.zoom))
+
+    def set_zoom(self, zoom):
+        if self.layout is None or zoom <= 0:
+            return
+        factor = zoom / self.zoom
+        self.zoom = zoom
+        # Scale the existing items about the origin; text keeps its font, so resize that
+        self.canvas.scale('all', 0, 0, factor, factor)
+        self.canvas.itemconfigure('label', font=self.font())
+        self.update_scrollregion()
+
+    def update_scrollregion(self):
+        self.canvas.config(scrollregion=self.canvas.bbox('all'))
+
+    def highlight(self, state=None, transition=None):
+        """Colours state, and the edge taking transition (symbol, next state) out of it, in red.
+
+        Whatever was highlighted before goes back to its colour in the layout.
+        """
+        for tag, color in self.highlighted:
+            self.recolor(tag, color)
+        self.highlighted = []
+        if self.layout is None or state is None:
+            return
+
+        name = str(state)
+        if name in self.layout['nodes']:
+            self.highlighted.append((f"node:{name}", self.layout['nodes'][name]['color']))
+        if transition is not None:
+            tag = f"edge:{name}:{transition[1]}"
+            if tag in self.edge_colors:
+                self.highlighted.append((tag, self.edge_colors[tag]))
+        for tag, _ in self.highlighted:
+            self.recolor(tag, HIGHLIGHT_COLOR)
+
+    def recolor(self, tag, color):
+        # Only outlines and lines change colour, labels stay black as in visualize_dfa
+        for item in self.canvas.find_withtag(f"{tag}&&shape"):
+            if self.canvas.type(item) == 'oval':
+                self.canvas.itemconfigure(item, outline=color)
+            else:
+                self.canvas.itemconfigure(item, fill=color)
@@ -0,0 +1,140 @@
+from bisect import bisect_right
+
+MAX_CODE_POINT = 0x10FFFF
+
+# Shorthand classes usable after a backslash, inside or outside brackets
+SHORTHAND_RANGES = {
+    'd': [(ord('0'), ord('9'))],
+    'w': [(ord('0'), ord('9')), (ord('A'), ord('Z')), (ord('_'), ord('_')), (ord('a'), ord('z'))],
+    's': [(ord('\t'), ord('\r')), (ord(' '), ord(' '))],
+}
+# Escapes standing for a single character
+ESCAPED_CHARS = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v'}
+# Characters that are escaped when a class is written out as its label
+LABEL_SPECIALS = '\\[]-^'
+LABEL_ESCAPES = {'\n': '\\n', '\t': '\\t', '\r': '\\r', '\f': '\\f', '\v': '\\v'}
+
+
+def normalize(ranges):
+    """Sorted, disjoint and non-adjacent list of the (lo, hi) code point ranges, inclusive."""
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            if hi > merged[-1][1]:
+                merged[-1][1] = hi
+        else:
+            merged.append([lo, hi])
+    return merged
+
+
+def complement(ranges):
+    """Code points not in the normalized ranges."""
+    result = []
+    lo = 0
+    for start, end in ranges:
+        if start > lo:
+            result.append([lo, start - 1])
+        lo = end + 1
+    if lo <= MAX_CODE_POINT:
+        result.append([lo, MAX_CODE_POINT])
+    return result
+
+
+def _label_char(code):
+    char = chr(code)
+    if char in LABEL_ESCAPES:
+        return LABEL_ESCAPES[char]
+    if char in LABEL_SPECIALS:
+        return '\\' + char
+    if not char.isprintable():
+        return f"\\u{{{code:x}}}"
+    return char
+
+
+def _label_ranges(ranges):
+    return ''.join(_label_char(lo) if lo == hi else f"{_label_char(lo)}-{_label_char(hi)}"
+                   for lo, hi in ranges)
+
+
+def label(ranges):
+    """Text of a symbol class: the character itself for a single one, a bracket expression
+    otherwise, negated when that is shorter. Different classes get different labels."""
+    if len(ranges) == 1 and ranges[0][0] == ranges[0][1]:
+        return chr(ranges[0][0])
+    positive = f"[{_label_ranges(ranges)}]"
+    negative = f"[^{_label_ranges(complement(ranges))}]"
+    return negative if len(negative) < len(positive) else positive
+
+
+class SymbolClasses:
+    """Partition of the characters into the classes that no transition label tells apart.
+
+    Two characters are in the same class when every literal and every bracket class of the
+    regex either contains both or neither, so the automata only need one transition per class.
+    Characters outside every label belong to no class. Each class is named by its label (see
+    label), which for a class of one character is that character.
+    """
+
+    def __init__(self, classes):
+        # classes: list of (label, normalized ranges)
+        self.classes = classes
+        bounds = sorted((lo, hi, name) for name, ranges in classes for lo, hi in ranges)
+        self.starts = [lo for lo, _, _ in bounds]
+        self.ends = [hi for _, hi, _ in bounds]
+        self.names = [name for _, _, name in bounds]
+        self.by_name = dict(classes)
+        self.memo = {}
+
+    @classmethod
+    def from_labels(cls, labels):
+        """Partition refining labels, a dict of each transition label to its normalized ranges.
+
+        Returns the partition and, for each label, the names of the classes it is split into.
+        """
+        points = sorted({point for ranges in labels.values() for lo, hi in ranges for point in (lo, hi + 1)})
+        # Elementary intervals [points[i], points[i + 1] - 1] and the labels covering each of them
+        covering = [[] for _ in points]
+        for key, ranges in labels.items():
+            for lo, hi in ranges:
+                for i in range(bisect_right(points, lo) - 1, bisect_right(points, hi)):
+                    covering[i].append(key)
+
+        by_signature = {}
+        for i, keys in enumerate(covering):
+            if keys:
+                by_signature.setdefault(frozenset(keys), []).append((points[i], points[i + 1] - 1))
+
+        classes = []
+        parts = {key: [] for key in labels}
+        for signature, ranges in by_signature.items():
+            ranges = normalize(ranges)
+            name = label(ranges)
+            classes.append((name, ranges))
+            for key in signature:
+                parts[key].append(name)
+        return cls(classes), parts
+
+    def __len__(self):
+        return len(self.classes)
+
+    def name_of(self, char):
+        """Name of the class of char, or None when no transition reads it."""
+        name = self.memo.get(char)
+        if name is None:
+            code = ord(char)
+            i = bisect_right(self.starts, code) - 1
+            if i < 0 or code > self.ends[i]:
+                return None
+            name = self.memo[char] = self.names[i]
+        return name
+
+    def ranges_of(self, name):
+        """Normalized ranges of the class with the given name."""
+        return self.by_name[name]
+
+    def to_list(self):
+        return [[name, ranges] for name, ranges in self.classes]
+
+    @classmethod
+    def from_list(cls, classes):
+        return cls([(name, [list(r) for r in ranges]) for name, ranges in classes])
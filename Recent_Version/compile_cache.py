@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+from instrumentation import stage
+from regex_parser import RegexParser
+from regex_to_nfa import RegexToNFA
+from scanner_generator import ScannerGenerator
+
+# Bump when the stored table layout or the pipeline output changes
+CACHE_FORMAT = 2
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_OPTIONS = {'dead_state': True}
+DEFAULT_MAXSIZE = 256
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'render_hits', 'render_misses', 'maxsize', 'currsize'])
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.environ.get('REGEX2DFA_CACHE_DIR') or os.path.join(base, 'regex2dfa')
+
+
+class DiskCache:
+    """Content-addressed store of compiled DFAs shared between processes.
+
+    Entries are written to a temporary file and renamed into place, so readers never see a
+    partial entry. The modification time of an entry is its last use; when the directory grows
+    past max_bytes the least recently used entries are removed.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, regex, alphabet, options):
+        payload = json.dumps([CACHE_FORMAT, regex, sorted(alphabet), options],
+                             sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.dfa')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Missing, or evicted by another process in the meantime
+            return None
+        return data
+
+    def put(self, key, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def discard(self, key):
+        # Remove an entry that could not be read back
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.dfa'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.dfa'):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def _symbols(parsed_regex):
+    if parsed_regex['type'] == 'symbol':
+        return {parsed_regex['value']}
+    if parsed_regex['type'] == 'class':
+        return set()
+    children = parsed_regex.get('terms') or parsed_regex.get('factors') or [parsed_regex['expr']]
+    return set().union(*(_symbols(child) for child in children))
+
+
+def compile_regex(regex, cache=None, options=None, stats=None, budget=None):
+    """Parse, convert and determinise regex, returning a ScannerGenerator.
+
+    With a DiskCache the final DFA is looked up by the normalised regex (its syntax tree),
+    its alphabet and the pipeline options before any NFA is built. With a PipelineStats every
+    stage is timed and counted into it. With a CompileBudget, building the NFA or determinising
+    it raises BudgetExceeded when it goes over a limit; cached DFAs are returned whatever their size.
+    """
+    options = dict(DEFAULT_OPTIONS, **(options or {}))
+    parsed_regex = RegexParser(stats).parse(regex)
+    scanner = ScannerGenerator()
+
+    if cache is not None:
+        with stage(stats, 'disk_cache'):
+            normalised = json.dumps(parsed_regex, sort_keys=True, separators=(',', ':'))
+            key = cache.key(normalised, _symbols(parsed_regex), options)
+            data = cache.get(key)
+            if data is not None:
+                try:
+                    scanner.from_table(json.loads(data))
+                except (ValueError, KeyError, IndexError, TypeError):
+                    # Truncated or otherwise invalid entry: a miss, and rewritten below
+                    cache.discard(key)
+                    scanner = ScannerGenerator()
+                    data = None
+        if stats is not None:
+            stats.count('disk_cache_hits' if data is not None else 'disk_cache_misses')
+        if data is not None:
+            return scanner
+
+    # One time limit for both constructions
+    started = budget.start() if budget is not None else None
+    nfa = RegexToNFA(stats).convert(parsed_regex, budget, started)
+    # The scanner may be cached and shared, so it only reports into stats while being built
+    scanner.stats = stats
+    try:
+        scanner.nfa_to_dfa(nfa, budget, started)
+    finally:
+        scanner.stats = None
+
+    if cache is not None:
+        with stage(stats, 'disk_cache'):
+            cache.put(key, json.dumps(scanner.to_table(), separators=(',', ':')).encode('utf-8'))
+    return scanner
+
+
+class PipelineCache:
+    """Bounded in-process LRU cache of compiled scanners and their graph layouts.
+
+    Keyed on the regex text and pipeline options; a miss goes through compile_regex (and so
+    through the DiskCache and under the CompileBudget when given). Scanners are shared between
+    callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, disk=None, budget=None):
+        self.maxsize = maxsize
+        self.disk = disk
+        self.budget = budget
+        self._entries = OrderedDict()  # key -> {'scanner': ScannerGenerator, 'plain': bytes or None}
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        self.render_hits = self.render_misses = 0
+
+    def _key(self, regex, options):
+        return regex, json.dumps(options, sort_keys=True) if options else ''
+
+    def _entry(self, regex, options, count=True, stats=None, budget=None):
+        key = self._key(regex, options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += count
+                return entry
+            self.misses += count
+
+        # Compile outside the lock; concurrent misses on the same regex just do the work twice
+        entry = {'scanner': compile_regex(regex, self.disk, options, stats, budget or self.budget),
+                 'plain': None}
+        with self._lock:
+            entry = self._entries.setdefault(key, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def compile(self, regex, options=None, stats=None, budget=None):
+        # stats only sees the pipeline stages on a miss; budget replaces the cache's own
+        return self._entry(regex, options, stats=stats, budget=budget)['scanner']
+
+    def graph_layout(self, regex, options=None, stats=None, budget=None):
+        # Graphviz 'plain' layout of the un-highlighted DFA, for canvas_renderer.parse_plain;
+        # laid out once per cached entry and only counted in the render statistics
+        entry = self._entry(regex, options, count=False, stats=stats, budget=budget)
+        data = entry['plain']
+        if data is not None:
+            with self._lock:
+                self.render_hits += 1
+            return data.decode('utf-8')
+
+        with self._lock:
+            self.render_misses += 1
+        with stage(stats, 'visualize_dfa'):
+            dot = entry['scanner'].visualize_dfa()
+        with stage(stats, 'render_plain'):
+            data = dot.pipe(format='plain')
+        entry['plain'] = data
+        return data.decode('utf-8')
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.render_hits, self.render_misses,
+                             self.maxsize, len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+            self.render_hits = self.render_misses = 0
@@ -1,27 +1,16 @@
-from regex_parser import RegexParser
-from regex_to_nfa import RegexToNFA
-from scanner_generator import ScannerGenerator
+from compile_cache import DiskCache, compile_regex
 
 def main():
     # Get regex from user
     regex = input("Enter your regular expression: ")
     
-    # Parse regex
-    parser = RegexParser()
+    # Parse, convert to NFA and DFA, reusing a cached DFA when available
     try:
-        parsed_regex = parser.parse(regex)
+        scanner = compile_regex(regex, DiskCache())
     except SyntaxError as e:
         print(f"Error parsing regex: {e}")
         return
 
-    # Convert to NFA
-    converter = RegexToNFA()
-    nfa = converter.convert(parsed_regex)
-
-    # Convert to DFA and create scanner
-    scanner = ScannerGenerator()
-    scanner.nfa_to_dfa(nfa)
-
     # Visualize the DFA
     scanner.visualize_dfa()
 
@@ -1,12 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
-from regex_parser import RegexParser
-from regex_to_nfa import RegexToNFA
-from scanner_generator import ScannerGenerator
-from PIL import Image, ImageTk
-import io
-from itertools import product
-from collections import deque
+from budget import CompileBudget, CompileCancelled
+from canvas_renderer import CanvasRenderer, parse_plain
+from compile_cache import DiskCache, PipelineCache
+from instrumentation import PipelineStats
+import queue
+import threading
+from itertools import chain, islice
+
+# Accepted strings are shown a page at a time, inserted in small chunks to keep the UI responsive
+ACCEPTED_PAGE_SIZE = 500
+ACCEPTED_CHUNK_SIZE = 50
+# Larger DFAs cannot be drawn usefully; stop before they freeze the window
+COMPILE_BUDGET = CompileBudget(max_states=2000, max_transitions=50000, timeout=10, max_nfa_states=100000)
+# How often the UI thread looks for results from the compile worker, in milliseconds
+COMPILE_POLL_MS = 50
 
 class LexicalAnalyzerGUI:
     def __init__(self, root):
@@ -17,7 +25,20 @@ class LexicalAnalyzerGUI:
         self.scanner = None
         self.current_graph = "DFA"
         self.nfa = None
-        self.original_image = None
+        self.accepted_strings_iter = None
+        self.accepted_shown = 0
+        # Compilation and rendering run on worker threads; results come back through this
+        # queue and are applied on the Tk thread. Only the job whose event is current counts.
+        self.compile_results = queue.Queue()
+        self.compile_job = None
+        self.compile_job_regex = None
+        self.compile_polling = False
+        try:
+            self.compile_cache = DiskCache()
+        except OSError:
+            # Cache directory not writable, compile every time
+            self.compile_cache = None
+        self.pipeline_cache = PipelineCache(disk=self.compile_cache, budget=COMPILE_BUDGET)
         self.setup_gui()
 
     def setup_gui(self):
@@ -38,7 +59,9 @@ class LexicalAnalyzerGUI:
         input_frame.pack(fill=tk.X, pady=5)
 
         ttk.Label(input_frame, text="Enter Regular Expression:").pack(anchor=tk.W)
-        self.regex_entry = ttk.Entry(input_frame, width=50)
+        self.regex_var = tk.StringVar()
+        self.regex_var.trace_add('write', self.on_regex_changed)
+        self.regex_entry = ttk.Entry(input_frame, textvariable=self.regex_var, width=50)
         self.regex_entry.pack(fill=tk.X, pady=(0, 5))
         
         ttk.Button(input_frame, text="Generate DFA", command=self.generate_dfa).pack(pady=5)
@@ -78,6 +101,8 @@ class LexicalAnalyzerGUI:
         self.length_entry.pack(side=tk.LEFT, padx=5)
         ttk.Button(length_frame, text="Generate Strings", 
                   command=self.generate_accepted_strings).pack(side=tk.LEFT, padx=5)
+        ttk.Button(length_frame, text="Show More",
+                  command=self.show_more_accepted_strings).pack(side=tk.LEFT, padx=5)
 
         self.accepted_text = scrolledtext.ScrolledText(accepted_frame, height=10, width=50)
         self.accepted_text.pack(fill=tk.BOTH, expand=True)
@@ -114,47 +139,8 @@ class LexicalAnalyzerGUI:
         v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        # Initialize zoom level
-        self.zoom_level = 1.0
-        self.original_image = None
-
-    def update_visualization(self, dot):
-        # Render the graph
-        png_data = dot.pipe(format='png')
-        
-        # Convert to PIL Image and store as original
-        self.original_image = Image.open(io.BytesIO(png_data))
-        
-        # Calculate initial scaling to fit the canvas while maintaining aspect ratio
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
-        img_width, img_height = self.original_image.size
-        
-        # Calculate scale factor
-        scale = min(canvas_width/img_width, canvas_height/img_height)
-        self.zoom_level = scale
-        
-        # Resize image
-        new_width = int(img_width * scale)
-        new_height = int(img_height * scale)
-        resized_image = self.original_image.resize(
-            (new_width, new_height), 
-            Image.Resampling.LANCZOS
-        )
-        
-        # Convert to PhotoImage and store reference
-        self.photo = ImageTk.PhotoImage(resized_image)
-        
-        # Update canvas
-        self.canvas.delete("all")
-        self.canvas.create_image(
-            canvas_width//2, canvas_height//2,
-            image=self.photo,
-            anchor=tk.CENTER
-        )
-        
-        # Update canvas scrollregion
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
+        # The DFA is laid out once and drawn as canvas items; highlights and zoom change the items
+        self.renderer = CanvasRenderer(self.canvas)
 
     def generate_dfa(self):
         regex = self.regex_entry.get()
@@ -162,28 +148,77 @@ class LexicalAnalyzerGUI:
             self.log_result("Please enter a regular expression.")
             return
 
+        # A new compile supersedes the one in progress
+        self.cancel_compile()
+        cancelled = threading.Event()
+        self.compile_job = cancelled
+        self.compile_job_regex = regex
+        self.log_result(f"Compiling: {regex}")
+        threading.Thread(target=self.compile_worker, args=(regex, cancelled), daemon=True).start()
+        if not self.compile_polling:
+            self.compile_polling = True
+            self.root.after(COMPILE_POLL_MS, self.poll_compile_results)
+
+    def compile_worker(self, regex, cancelled):
+        # Runs off the Tk thread: no widget access here
         try:
-            # Parse regex
-            parser = RegexParser()
-            parsed_regex = parser.parse(regex)
-
-            # Convert to NFA
-            converter = RegexToNFA()
-            nfa = converter.convert(parsed_regex)
-
-            # Convert to DFA and create scanner
-            self.scanner = ScannerGenerator()
-            self.scanner.nfa_to_dfa(nfa)
+            budget = COMPILE_BUDGET.cancellable(cancelled)
+            stats = PipelineStats()
+            # Parse, convert to NFA and DFA, reusing a cached DFA when available
+            scanner = self.pipeline_cache.compile(regex, stats=stats, budget=budget)
+            if cancelled.is_set():
+                raise CompileCancelled()
+            # Lay out the visualization, once per cached regex
+            layout = parse_plain(self.pipeline_cache.graph_layout(regex, stats=stats, budget=budget))
+            self.compile_results.put((cancelled, regex, (scanner, layout, stats), None))
+        except Exception as e:
+            self.compile_results.put((cancelled, regex, None, e))
+
+    def poll_compile_results(self):
+        while True:
+            try:
+                cancelled, regex, result, error = self.compile_results.get_nowait()
+            except queue.Empty:
+                break
+            # Results of superseded or cancelled jobs are dropped
+            if cancelled is self.compile_job and not cancelled.is_set():
+                self.compile_job = None
+                self.finish_compile(regex, result, error)
+        if self.compile_job is not None:
+            self.root.after(COMPILE_POLL_MS, self.poll_compile_results)
+        else:
+            self.compile_polling = False
+
+    def cancel_compile(self):
+        if self.compile_job is not None:
+            self.compile_job.set()
+            self.log_result(f"Cancelled: {self.compile_job_regex}")
+            self.compile_job = None
+
+    def on_regex_changed(self, *args):
+        # Editing the regex abandons a compile of the old text
+        if self.compile_job is not None and self.regex_var.get() != self.compile_job_regex:
+            self.cancel_compile()
+
+    def finish_compile(self, regex, result, error):
+        if error is not None:
+            self.log_result(f"Error generating DFA: {str(error)}")
+            return
 
-            # Generate and display visualization
-            dot = self.scanner.visualize_dfa()
-            self.update_visualization(dot)
+        try:
+            self.scanner, layout, stats = result
+            self.renderer.draw(layout)
 
             # Log information about states
             total_states = len(self.scanner.dfa)
             dead_states = sum(1 for state in self.scanner.dfa if self.scanner.is_dead_state(state))
             self.log_result(f"DFA generated successfully for regex: {regex}")
             self.log_result(f"Total states: {total_states} (including {dead_states} dead state{'s' if dead_states != 1 else ''})")
+            info = self.pipeline_cache.info()
+            self.log_result(f"Compile cache: {info.hits} hits, {info.misses} misses; "
+                            f"render cache: {info.render_hits} hits, {info.render_misses} misses")
+            if stats.timings:
+                self.log_result(f"Pipeline: {stats.summary()}")
             
             # Generate accepted strings automatically
             self.generate_accepted_strings()
@@ -198,74 +233,54 @@ class LexicalAnalyzerGUI:
 
         try:
             max_length = int(self.length_var.get())
-            if max_length > 10:
-                self.log_result("Maximum length limited to 10 to prevent excessive computation.")
-                max_length = 10
+            if max_length < 0:
+                raise ValueError
         except ValueError:
             self.log_result("Please enter a valid number for maximum length.")
             return
 
-        # Get alphabet from all DFA states
-        alphabet = set()
-        for state in self.scanner.dfa:
-            alphabet.update(state.transitions.keys())
-        alphabet = sorted(list(alphabet))
+        # Count the accepted strings of each length over the DFA instead of enumerating them
+        total = sum(self.scanner.count_accepted(length) for length in range(max_length + 1))
 
-        if not alphabet:
-            self.log_result("No transitions found in DFA.")
-            return
+        # Clear and update the accepted strings text area
+        self.accepted_text.delete('1.0', tk.END)
+        self.accepted_shown = 0
 
-        accepted_strings = []
-        
-        # Check for empty string acceptance (if initial state is final)
-        if self.scanner.dfa[0].is_final:
-            accepted_strings.append('')
+        if not total:
+            self.accepted_strings_iter = None
+            self.accepted_text.insert(tk.END, "No strings accepted up to the specified length.")
+            self.log_result("No accepted strings found")
+            return
 
-        # Generate strings using BFS to avoid generating unnecessary strings
-        queue = deque([('', self.scanner.dfa[0])])
-        seen_states = set()
+        # Shortest first, then alphabetically, generated lazily one length at a time
+        self.accepted_strings_iter = chain.from_iterable(
+            self.scanner.accepted_strings(length) for length in range(max_length + 1))
+        self.log_result(f"Generated {total} accepted strings")
+        self.show_more_accepted_strings()
 
-        while queue:
-            current_string, current_state = queue.popleft()
-            
-            # Skip if string length exceeds maximum
-            if len(current_string) > max_length:
-                continue
-
-            # Add string to accepted list if in final state
-            if current_state.is_final and current_string:
-                accepted_strings.append(current_string)
-
-            # Only continue if we can add more characters
-            if len(current_string) < max_length:
-                # Try each symbol in the alphabet
-                for symbol in alphabet:
-                    if symbol in current_state.transitions:
-                        next_state = current_state.transitions[symbol]
-                        new_string = current_string + symbol
-                        state_string_pair = (new_string, next_state)
-                        
-                        # Only add if we haven't seen this exact state with this exact string before
-                        if state_string_pair not in seen_states:
-                            seen_states.add(state_string_pair)
-                            queue.append(state_string_pair)
-
-        # Sort strings by length and then alphabetically
-        accepted_strings.sort(key=lambda x: (len(x), x))
+    def show_more_accepted_strings(self):
+        strings = self.accepted_strings_iter
+        if strings is None:
+            return
 
-        # Clear and update the accepted strings text area
-        self.accepted_text.delete('1.0', tk.END)
-        
-        if accepted_strings:
-            for i, string in enumerate(accepted_strings, 1):
+        def insert_chunk(remaining):
+            # Stop if the strings were regenerated meanwhile
+            if strings is not self.accepted_strings_iter:
+                return
+            chunk = list(islice(strings, min(remaining, ACCEPTED_CHUNK_SIZE)))
+            for string in chunk:
+                self.accepted_shown += 1
                 if string == '':
-                    self.accepted_text.insert(tk.END, f"{i}. ε (empty string)\n")
+                    self.accepted_text.insert(tk.END, f"{self.accepted_shown}. ε (empty string)\n")
                 else:
-                    self.accepted_text.insert(tk.END, f"{i}. {string}\n")
-            self.log_result(f"Generated {len(accepted_strings)} accepted strings")
-        else:
-            self.accepted_text.insert(tk.END, "No strings accepted up to the specified length.")
-            self.log_result("No accepted strings found")
+                    self.accepted_text.insert(tk.END, f"{self.accepted_shown}. {string}\n")
+            remaining -= len(chunk)
+            if len(chunk) < ACCEPTED_CHUNK_SIZE and remaining > 0:
+                self.accepted_strings_iter = None
+            elif remaining > 0:
+                self.root.after(1, lambda: insert_chunk(remaining))
+
+        insert_chunk(ACCEPTED_PAGE_SIZE)
 
     def test_input(self):
         if not self.scanner:
@@ -304,11 +319,7 @@ class LexicalAnalyzerGUI:
                     self.log_result(f"Input '{input_string}' is {result} by the DFA", "result")
                     
                     # Show final state with special highlighting
-                    dot = self.scanner.visualize_dfa(
-                        highlight_state=current_state,
-                        highlight_transition=None
-                    )
-                    self.update_visualization(dot)
+                    self.renderer.highlight(current_state)
                 return
 
             current_state, transition = steps[step_index]
@@ -317,12 +328,8 @@ class LexicalAnalyzerGUI:
                 self.log_result("Input rejected - no valid transition", "error")
                 return
             
-            # Update visualization with smooth transition
-            dot = self.scanner.visualize_dfa(
-                highlight_state=current_state,
-                highlight_transition=transition
-            )
-            self.update_visualization(dot)
+            # Recolour the current state and transition; the layout stays as it is
+            self.renderer.highlight(current_state, transition)
             
             # Add position indicator in results with improved formatting
             if transition:
@@ -353,51 +360,13 @@ class LexicalAnalyzerGUI:
         self.results_text.see(tk.END)
 
     def zoom_in(self):
-        self.zoom_level *= 1.2
-        self.update_zoom()
+        self.renderer.set_zoom(self.renderer.zoom * 1.2)
 
     def zoom_out(self):
-        self.zoom_level /= 1.2
-        self.update_zoom()
+        self.renderer.set_zoom(self.renderer.zoom / 1.2)
 
     def reset_zoom(self):
-        self.zoom_level = 1.0
-        self.update_zoom()
-
-    def update_zoom(self):
-        if self.original_image is None:
-            return
-        
-        # Get canvas dimensions
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
-        
-        # Get original image dimensions
-        img_width, img_height = self.original_image.size
-        
-        # Calculate new dimensions
-        new_width = int(img_width * self.zoom_level)
-        new_height = int(img_height * self.zoom_level)
-        
-        # Resize image
-        resized_image = self.original_image.resize(
-            (new_width, new_height), 
-            Image.Resampling.LANCZOS
-        )
-        
-        # Update PhotoImage
-        self.photo = ImageTk.PhotoImage(resized_image)
-        
-        # Update canvas
-        self.canvas.delete("all")
-        self.canvas.create_image(
-            canvas_width//2, canvas_height//2,
-            image=self.photo,
-            anchor=tk.CENTER
-        )
-        
-        # Update canvas scrollregion
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
+        self.renderer.set_zoom(1.0)
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,47 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class PipelineStats:
+    """Wall time per pipeline stage and counters, collected while compiling a regex.
+
+    Opt-in: pass an instance as the stats argument of RegexParser, RegexToNFA, ScannerGenerator
+    or compile_regex. Stages are timed cumulatively, so a stage that runs several times (such as
+    epsilon_closure inside nfa_to_dfa) adds up. The callback, if any, is called as
+    callback(stage, seconds, stats) each time a stage finishes.
+    """
+
+    def __init__(self, callback=None):
+        self.timings = {}
+        self.counters = {}
+        self.callback = callback
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            self.add_time(name, elapsed)
+            if self.callback is not None:
+                self.callback(name, elapsed, self)
+
+    def add_time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self):
+        return {'timings': dict(self.timings), 'counters': dict(self.counters)}
+
+    def summary(self):
+        timings = ', '.join(f"{name} {seconds * 1000:.2f} ms" for name, seconds in self.timings.items())
+        counters = ', '.join(f"{name} {value}" for name, value in self.counters.items())
+        return '; '.join(part for part in (timings, counters) if part)
+
+
+def stage(stats, name):
+    # Times a stage when instrumentation is on, does nothing otherwise
+    return stats.stage(name) if stats is not None else nullcontext()
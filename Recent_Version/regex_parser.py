@@ -1,15 +1,23 @@
+import re
 from typing import List
 from regex_to_nfa import NFA
+from instrumentation import stage
+from char_classes import SHORTHAND_RANGES, ESCAPED_CHARS, normalize, complement
+
+# {m}, {m,} or {m,n}; a '{' that does not start one of these is a literal symbol
+COUNTED_REPETITION = re.compile(r'\{(\d+)(,(\d*))?\}')
 
 class RegexParser:
-    def __init__(self):
+    def __init__(self, stats=None):
         self.pos = 0
         self.regex = ""
+        self.stats = stats
 
     def parse(self, regex_str):
         self.regex = regex_str
         self.pos = 0
-        return self.parse_expression()
+        with stage(self.stats, 'parse'):
+            return self.parse_expression()
 
     def parse_expression(self):
         terms = [self.parse_term()]
@@ -40,11 +48,21 @@ class RegexParser:
                 raise SyntaxError("Missing closing parenthesis")
             self.pos += 1
             result = subexpr
+        elif char == '[':
+            self.pos += 1
+            result = self.parse_class()
+        elif char == '.':
+            # Any character but a newline
+            self.pos += 1
+            result = self.class_node(complement([[ord('\n'), ord('\n')]]))
+        elif char == '\\':
+            self.pos += 1
+            result = self.class_node(self.parse_escape())
         else:
             self.pos += 1
             result = {'type': 'symbol', 'value': char}
 
-        # Handle closure operators (* and +)
+        # Handle closure operators (*, + and counted repetition)
         if self.pos < len(self.regex):
             if self.regex[self.pos] == '*':
                 self.pos += 1
@@ -52,5 +70,82 @@ class RegexParser:
             elif self.regex[self.pos] == '+':
                 self.pos += 1
                 result = {'type': 'plus', 'expr': result}
+            elif self.regex[self.pos] == '{':
+                result = self.parse_repetition(result)
+
+        return result
+
+    def parse_repetition(self, expr):
+        # expr{m}, expr{m,} (max None) or expr{m,n}
+        match = COUNTED_REPETITION.match(self.regex, self.pos)
+        if not match:
+            return expr
+        self.pos = match.end()
+        low = int(match.group(1))
+        if match.group(2) is None:
+            high = low
+        elif match.group(3):
+            high = int(match.group(3))
+        else:
+            high = None
+        if high is not None and high < low:
+            raise SyntaxError(f"Invalid repetition {{{low},{high}}}: maximum below minimum")
+        return {'type': 'repeat', 'expr': expr, 'min': low, 'max': high}
+
+    def parse_escape(self):
+        # Ranges of the character or shorthand class after a backslash
+        if self.pos >= len(self.regex):
+            raise SyntaxError("Unexpected end of regex after '\\'")
+        char = self.regex[self.pos]
+        self.pos += 1
+        if char in SHORTHAND_RANGES:
+            return normalize(SHORTHAND_RANGES[char])
+        if char.lower() in SHORTHAND_RANGES:
+            # \D, \W and \S are the complements of \d, \w and \s
+            return complement(normalize(SHORTHAND_RANGES[char.lower()]))
+        char = ESCAPED_CHARS.get(char, char)
+        return [[ord(char), ord(char)]]
+
+    def parse_class_char(self):
+        # One character of a bracket expression, escaped or not, as its ranges
+        char = self.regex[self.pos]
+        self.pos += 1
+        if char == '\\':
+            return self.parse_escape()
+        return [[ord(char), ord(char)]]
+
+    def parse_class(self):
+        # Bracket expression after '[': [abc], [a-z0-9_], [^"\\]; a ']' right after '[' or '[^' is literal
+        negated = self.pos < len(self.regex) and self.regex[self.pos] == '^'
+        if negated:
+            self.pos += 1
+        ranges = []
+        first = True
+        while True:
+            if self.pos >= len(self.regex):
+                raise SyntaxError("Missing closing bracket")
+            if self.regex[self.pos] == ']' and not first:
+                self.pos += 1
+                break
+            first = False
+            item = self.parse_class_char()
+            # A single character, '-' and another character make a range
+            if (len(item) == 1 and item[0][0] == item[0][1] and self.pos + 1 < len(self.regex)
+                    and self.regex[self.pos] == '-' and self.regex[self.pos + 1] != ']'):
+                self.pos += 1
+                end = self.parse_class_char()
+                if len(end) != 1 or end[0][0] != end[0][1]:
+                    raise SyntaxError("Invalid range end in character class")
+                lo, hi = item[0][0], end[0][0]
+                if lo > hi:
+                    raise SyntaxError(f"Invalid range {chr(lo)}-{chr(hi)} in character class")
+                item = [[lo, hi]]
+            ranges.extend(item)
+        ranges = normalize(ranges)
+        return self.class_node(complement(ranges) if negated else ranges)
 
-        return result
\ No newline at end of file
+    def class_node(self, ranges):
+        # A class of one character is that symbol
+        if len(ranges) == 1 and ranges[0][0] == ranges[0][1]:
+            return {'type': 'symbol', 'value': chr(ranges[0][0])}
+        return {'type': 'class', 'ranges': ranges}
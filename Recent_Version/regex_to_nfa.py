@@ -1,3 +1,6 @@
+from instrumentation import stage
+from char_classes import SymbolClasses
+
 class State:
     def __init__(self, is_final=False):
         self.transitions = {}  # dict of symbol -> list of states
@@ -11,6 +14,7 @@ class NFA:
         self.start_state = None
         self.final_states = set()
         self.alphabet = set()
+        self.classes = None  # SymbolClasses naming the alphabet, None when the symbols are characters
 
     def add_state(self, state):
         state.state_id = len(self.states)
@@ -18,10 +22,36 @@ class NFA:
         return state
 
 class RegexToNFA:
-    def __init__(self):
+    def __init__(self, stats=None):
         self.counter = 0
+        self.stats = stats
+        self.budget = None
+        self.started = None
+        self.copied_states = 0
 
-    def convert(self, parsed_regex):
+    def convert(self, parsed_regex, budget=None, started=None):
+        # Thompson construction of the whole regex. With a CompileBudget, counted repetitions
+        # raise BudgetExceeded once their copies go over max_nfa_states or the time limit,
+        # counted from started (budget.start() by default)
+        self.budget = budget
+        self.started = budget.start() if budget is not None and started is None else started
+        self.copied_states = 0
+        with stage(self.stats, 'thompson'):
+            nfa = self._convert(parsed_regex)
+        # Sub-NFAs are numbered on their own; number the states of the whole NFA once
+        for state_id, state in enumerate(nfa.states):
+            state.state_id = state_id
+        with stage(self.stats, 'symbol_classes'):
+            self.compress_alphabet(nfa)
+        if self.stats is not None:
+            self.stats.count('symbol_classes', len(nfa.alphabet))
+            self.stats.count('nfa_states', len(nfa.states))
+            self.stats.count('nfa_transitions', sum(
+                len(state.epsilon_transitions) + sum(len(targets) for targets in state.transitions.values())
+                for state in nfa.states))
+        return nfa
+
+    def _convert(self, parsed_regex):
         if parsed_regex['type'] == 'symbol':
             return self.create_basic_nfa(parsed_regex['value'])
         elif parsed_regex['type'] == 'union':
@@ -32,6 +62,31 @@ class RegexToNFA:
             return self.create_kleene_star_nfa(parsed_regex['expr'])
         elif parsed_regex['type'] == 'plus':
             return self.create_plus_nfa(parsed_regex['expr'])
+        elif parsed_regex['type'] == 'class':
+            return self.create_class_nfa(parsed_regex['ranges'])
+        elif parsed_regex['type'] == 'repeat':
+            return self.create_repeat_nfa(parsed_regex['expr'], parsed_regex['min'], parsed_regex['max'])
+
+    def compress_alphabet(self, nfa):
+        # Replace the symbols and range labels of the transitions by the classes of characters
+        # they partition the alphabet into, so that an edge such as [a-z] is not split into one
+        # transition per letter, and characters no label tells apart share one DFA column.
+        # Without range labels every literal is a class of its own and nothing changes
+        if all(isinstance(symbol, str) for symbol in nfa.alphabet):
+            return
+        labels = {symbol: [[ord(symbol), ord(symbol)]] if isinstance(symbol, str) else [list(r) for r in symbol]
+                  for symbol in nfa.alphabet}
+        nfa.classes, parts = SymbolClasses.from_labels(labels)
+        # A literal is still a class of its own, so only the range labels need rewriting
+        for state in nfa.states:
+            if all(isinstance(symbol, str) for symbol in state.transitions):
+                continue
+            transitions = {}
+            for symbol, targets in state.transitions.items():
+                for name in parts[symbol]:
+                    transitions.setdefault(name, []).extend(targets)
+            state.transitions = transitions
+        nfa.alphabet = {name for name, _ in nfa.classes.classes}
 
     def create_basic_nfa(self, symbol):
         nfa = NFA()
@@ -48,6 +103,23 @@ class RegexToNFA:
         
         return nfa
 
+    def create_class_nfa(self, ranges):
+        # One edge labelled with the whole range set, as a tuple of (lo, hi) code points
+        nfa = NFA()
+        start = State()
+        end = State(is_final=True)
+
+        label = tuple(tuple(r) for r in ranges)
+        start.transitions[label] = [end]
+        nfa.alphabet.add(label)
+
+        nfa.add_state(start)
+        nfa.add_state(end)
+        nfa.start_state = start
+        nfa.final_states.add(end)
+
+        return nfa
+
     def create_union_nfa(self, terms):
         nfa = NFA()
         start = State()
@@ -57,7 +129,7 @@ class RegexToNFA:
         nfa.add_state(end)
         
         for term in terms:
-            sub_nfa = self.convert(term)
+            sub_nfa = self._convert(term)
             start.epsilon_transitions.add(sub_nfa.start_state)
             for final in sub_nfa.final_states:
                 final.epsilon_transitions.add(end)
@@ -74,10 +146,10 @@ class RegexToNFA:
         if not factors:
             return None
         
-        result = self.convert(factors[0])
+        result = self._convert(factors[0])
         
         for factor in factors[1:]:
-            second = self.convert(factor)
+            second = self._convert(factor)
             for final in result.final_states:
                 final.epsilon_transitions.add(second.start_state)
                 final.is_final = False
@@ -93,7 +165,7 @@ class RegexToNFA:
         start = State()
         end = State(is_final=True)
         
-        sub_nfa = self.convert(expr)
+        sub_nfa = self._convert(expr)
         
         nfa.add_state(start)
         nfa.add_state(end)
@@ -113,12 +185,75 @@ class RegexToNFA:
         
         return nfa
 
+    def copy_nfa(self, nfa):
+        # Same states and transitions, as new State objects
+        result = NFA()
+        copies = {}
+        for state in nfa.states:
+            copies[state] = result.add_state(State(is_final=state.is_final))
+        for state, copy in copies.items():
+            copy.transitions = {symbol: [copies[target] for target in targets]
+                                for symbol, targets in state.transitions.items()}
+            copy.epsilon_transitions = {copies[target] for target in state.epsilon_transitions}
+        result.start_state = copies[nfa.start_state]
+        result.final_states = {copies[state] for state in nfa.final_states}
+        result.alphabet = nfa.alphabet
+        return result
+
+    def create_repeat_nfa(self, expr, low, high):
+        # expr{low,high}, high None for no maximum. The sub-NFA is built once and copied, not
+        # converted again for every repetition. The optional copies are nested,
+        # expr{2,4} = expr expr (expr (expr)?)?, so every copy has at most two epsilon
+        # transitions out and epsilon closures stay small however large the counts are.
+        # Without a maximum the last copy loops: expr{2,} = expr expr+. Every copy is checked
+        # against the budget, so a nested count such as (a{1000}){1000} stops early.
+        nfa = NFA()
+        start = State()
+        end = State(is_final=True)
+        nfa.add_state(start)
+        nfa.add_state(end)
+        nfa.start_state = start
+        nfa.final_states = {end}
+
+        count = max(low, 1) if high is None else high
+        if count == 0:
+            start.epsilon_transitions.add(end)
+            return nfa
+
+        template = self._convert(expr)
+        copies = [template]
+        for _ in range(count - 1):
+            copies.append(self.copy_nfa(template))
+            self.copied_states += len(template.states)
+            if self.budget is not None:
+                self.budget.check_nfa(self.started, self.copied_states)
+        nfa.alphabet = template.alphabet
+
+        tails = {start}
+        for i, copy in enumerate(copies):
+            if i >= low:
+                for tail in tails:
+                    tail.epsilon_transitions.add(end)
+            for tail in tails:
+                tail.epsilon_transitions.add(copy.start_state)
+            for final in copy.final_states:
+                final.is_final = False
+            tails = copy.final_states
+            nfa.states.extend(copy.states)
+
+        for tail in tails:
+            tail.epsilon_transitions.add(end)
+            if high is None:
+                tail.epsilon_transitions.add(copies[-1].start_state)
+
+        return nfa
+
     def create_plus_nfa(self, expr):
         nfa = NFA()
         start = State()
         end = State(is_final=True)
         
-        sub_nfa = self.convert(expr)
+        sub_nfa = self._convert(expr)
         
         nfa.add_state(start)
         nfa.add_state(end)
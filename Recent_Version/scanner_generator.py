@@ -4,7 +4,14 @@ from regex_to_nfa import NFA, State
 from graphviz import Digraph
 from PIL import Image
 from collections import deque
+from instrumentation import stage
+from char_classes import SymbolClasses
 import io
+import threading
+import time
+
+# Sets of DFA states the lazy reverse DFA of a Searcher keeps before it starts over
+SEARCH_CACHE_SETS = 10000
 
 class DFAState:
     def __init__(self, nfa_states):
@@ -13,10 +20,115 @@ class DFAState:
         self.is_final = any(state.is_final for state in nfa_states)
         self.state_id = None
 
+class Searcher:
+    """Unanchored leftmost-longest search with the DFA of a scanner.
+
+    A backward pass reads the text through the reverse of the DFA with a loop on its final states,
+    determinised lazily: the set it is in at position i holds the DFA states from which some prefix
+    of text[i:] leads to a final state, so a match starts at i when the start state is in it. A
+    forward pass then loops over the text up to the next start and runs the DFA from there, for as
+    long as its state is in the set of the position it has reached, that is while a longer match is
+    still possible; the last final state it went through ends the match. Matches do not overlap, so
+    both passes do constant work per character once the sets they go through are known.
+
+    The sets and their transitions belong to the searcher, which is reused across texts but not
+    shared between threads; the scanner itself is only read.
+    """
+
+    def __init__(self, scanner):
+        if not scanner.dfa:
+            raise Exception("DFA not generated yet")
+        self.scanner = scanner
+        self.predecessors, self.finals = scanner.search_index()
+        self.clear()
+
+    def clear(self):
+        self.index = {}   # set of DFA state ids -> number
+        self.sets = []    # number -> frozenset of DFA state ids
+        self.begins = []  # number -> whether the start state is in the set
+        self.moves = []   # number -> {symbol: number of the next set}
+
+    def set_number(self, states):
+        number = self.index.get(states)
+        if number is None:
+            number = self.index[states] = len(self.sets)
+            self.sets.append(states)
+            self.begins.append(0 in states)
+            self.moves.append({})
+        return number
+
+    def move(self, number, symbol):
+        # Reading symbol backwards: the predecessors of the states of the set, and the final states
+        sources = self.predecessors.get(symbol, {})
+        following = set(self.finals)
+        for state_id in self.sets[number]:
+            following.update(sources.get(state_id, ()))
+        return self.set_number(frozenset(following))
+
+    def live_sets(self, text):
+        # live[i] is the set of the backward pass at position i (0 <= i <= len(text)), and
+        # starts[i] is 1 when a match starts at i
+        n = len(text)
+        symbol_of = self.scanner.symbol_of
+        live = [None] * (n + 1)
+        starts = bytearray(n + 1)
+        current = self.set_number(self.finals)
+        live[n], starts[n] = self.sets[current], self.begins[current]
+        for i in range(n - 1, -1, -1):
+            symbol = symbol_of(text[i])
+            number = self.moves[current].get(symbol)
+            if number is None:
+                if len(self.sets) >= SEARCH_CACHE_SETS:
+                    # Start the lazy DFA over rather than let it grow without bound
+                    states = self.sets[current]
+                    self.clear()
+                    current = self.set_number(states)
+                number = self.moves[current][symbol] = self.move(current, symbol)
+            current = number
+            live[i], starts[i] = self.sets[current], self.begins[current]
+        return live, starts
+
+    def search(self, text, pos=0):
+        # Leftmost-longest match inside text at or after pos, as (start, end), or None
+        return next(self.finditer(text, pos), None)
+
+    def count(self, text, pos=0):
+        # Number of matches finditer reports
+        return sum(1 for _ in self.finditer(text, pos))
+
+    def finditer(self, text, pos=0):
+        # Non-overlapping leftmost-longest matches (start, end), from left to right. After an
+        # empty match the search goes on one character further
+        live, starts = self.live_sets(text)
+        symbol_of = self.scanner.symbol_of
+        start_state = self.scanner.state_map[0]
+        n = len(text)
+        while pos <= n:
+            pos = starts.find(1, pos)
+            if pos < 0:
+                return
+            state, i = start_state, pos
+            end = pos if state.is_final else -1
+            while i < n:
+                state = state.transitions.get(symbol_of(text[i]))
+                i += 1
+                if state is None or state.state_id not in live[i]:
+                    break
+                if state.is_final:
+                    end = i
+            yield pos, end
+            pos = end if end > pos else pos + 1
+
+
 class ScannerGenerator:
-    def __init__(self):
+    def __init__(self, stats=None):
         self.dfa = None
         self.state_map = {}
+        self.suffix_counts = None
+        self.search_tables = None
+        self.search_lock = threading.Lock()
+        self.classes = None  # SymbolClasses of the transition labels, None when they are the characters
+        self.stats = stats
         
     def add_token(self, token_name: str, regex: str) -> None:
         self.token_definitions[token_name] = regex
@@ -54,6 +166,9 @@ class Scanner:
 ''' 
 
     def epsilon_closure(self, nfa_states):
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter()
         closure = set(nfa_states)
         stack = list(nfa_states)
         
@@ -64,9 +179,26 @@ class Scanner:
                     closure.add(eps_state)
                     stack.append(eps_state)
         
+        if stats is not None:
+            # Timed by hand: a context manager per call would cost more than most closures
+            stats.add_time('epsilon_closure', time.perf_counter() - start)
+            stats.count('closure_calls')
+            stats.count('closure_states', len(closure))
         return closure
 
-    def nfa_to_dfa(self, nfa):
+    def nfa_to_dfa(self, nfa, budget=None, started=None):
+        # Time spent in epsilon_closure and add_dead_state is also reported on its own.
+        # With a CompileBudget, raises BudgetExceeded instead of growing past its limits;
+        # the time limit counts from started (budget.start() by default)
+        with stage(self.stats, 'nfa_to_dfa'):
+            self._subset_construction(nfa, budget, started)
+
+    def _subset_construction(self, nfa, budget=None, started=None):
+        transitions_examined = 0
+        subset_hits = 0
+        transitions = 0
+        if budget is not None and started is None:
+            started = budget.start()
         dfa_states = []
         unmarked_states = deque()
         
@@ -75,33 +207,38 @@ class Scanner:
         start_state = DFAState(start_closure)
         dfa_states.append(start_state)
         unmarked_states.append(start_state)
+        # DFA state of each NFA state set, so a subset is found without scanning the DFA
+        subsets = {start_state.nfa_states: start_state}
         
         while unmarked_states:
             current_state = unmarked_states.popleft()
+            if budget is not None:
+                budget.check(started, len(dfa_states), transitions, len(unmarked_states), len(nfa.states))
             
             for symbol in nfa.alphabet:
                 next_states = set()
                 for nfa_state in current_state.nfa_states:
                     if symbol in nfa_state.transitions:
+                        transitions_examined += len(nfa_state.transitions[symbol])
                         next_states.update(nfa_state.transitions[symbol])
                 
                 if next_states:
-                    next_states = self.epsilon_closure(next_states)
-                    new_state = DFAState(next_states)
+                    next_states = frozenset(self.epsilon_closure(next_states))
+                    new_state = subsets.get(next_states)
                     
-                    # Check if this state already exists
-                    exists = False
-                    for existing_state in dfa_states:
-                        if existing_state.nfa_states == new_state.nfa_states:
-                            new_state = existing_state
-                            exists = True
-                            break
-                    
-                    if not exists:
+                    if new_state is not None:
+                        subset_hits += 1
+                    else:
+                        new_state = DFAState(next_states)
+                        subsets[next_states] = new_state
                         dfa_states.append(new_state)
                         unmarked_states.append(new_state)
                     
                     current_state.transitions[symbol] = new_state
+                    transitions += 1
+        
+        if budget is not None:
+            budget.check(started, len(dfa_states), transitions, 0, len(nfa.states))
         
         # Get complete alphabet from NFA
         alphabet = set()
@@ -114,11 +251,23 @@ class Scanner:
             self.state_map[state.state_id] = state
         
         self.dfa = dfa_states
+        self.suffix_counts = None
+        self.search_tables = None
+        self.classes = nfa.classes
+        if self.stats is not None:
+            self.stats.count('transitions_examined', transitions_examined)
+            self.stats.count('subset_hits', subset_hits)
 
         # After converting NFA to DFA, add dead state
         self.add_dead_state()
+        if self.stats is not None:
+            self.stats.count('dfa_states', len(self.dfa))
 
     def add_dead_state(self):
+        with stage(self.stats, 'add_dead_state'):
+            self._add_dead_state()
+
+    def _add_dead_state(self):
         # Get all symbols from existing transitions
         alphabet = set()
         for state in self.dfa:
@@ -146,7 +295,44 @@ class Scanner:
             self.dfa.append(dead_state)
             self.state_map[dead_state.state_id] = dead_state
 
+    def to_table(self):
+        # Compact, JSON friendly form of the DFA: one row per state, one column per symbol
+        if not self.dfa:
+            raise Exception("DFA not generated yet")
+        alphabet = sorted({symbol for state in self.dfa for symbol in state.transitions})
+        return {
+            'alphabet': alphabet,
+            'classes': self.classes.to_list() if self.classes is not None else None,
+            'final': [state.state_id for state in self.dfa if state.is_final],
+            'delta': [[state.transitions[symbol].state_id if symbol in state.transitions else -1
+                       for symbol in alphabet] for state in self.dfa],
+        }
+
+    def from_table(self, table):
+        # Rebuild the DFA states from the output of to_table (NFA state sets are not kept)
+        final = set(table['final'])
+        self.dfa = []
+        self.state_map = {}
+        self.suffix_counts = None
+        self.search_tables = None
+        classes = table.get('classes')
+        self.classes = SymbolClasses.from_list(classes) if classes is not None else None
+        for state_id in range(len(table['delta'])):
+            state = DFAState(set())
+            state.is_final = state_id in final
+            state.state_id = state_id
+            self.dfa.append(state)
+            self.state_map[state_id] = state
+        for state, row in zip(self.dfa, table['delta']):
+            for symbol, target in zip(table['alphabet'], row):
+                if target >= 0:
+                    state.transitions[symbol] = self.dfa[target]
+
     def visualize_dfa(self, highlight_state=None, highlight_transition=None):
+        with stage(self.stats, 'visualize_dfa'):
+            return self._visualize_dfa(highlight_state, highlight_transition)
+
+    def _visualize_dfa(self, highlight_state=None, highlight_transition=None):
         dot = Digraph()
         dot.attr(rankdir='LR')
         
@@ -218,14 +404,159 @@ class Scanner:
             raise Exception("DFA not generated yet")
         
         current_state = self.state_map[0]  # Start state
-        
+        classes = self.classes
+        
+        # Without symbol classes the labels are the characters themselves
+        if classes is None:
+            for char in input_string:
+                if char not in current_state.transitions:
+                    return False
+                current_state = current_state.transitions[char]
+            return current_state.is_final
+
+        memo = classes.memo
         for char in input_string:
-            if char not in current_state.transitions:
+            symbol = memo.get(char) or classes.name_of(char)
+            if symbol not in current_state.transitions:
                 return False
-            current_state = current_state.transitions[char]
+            current_state = current_state.transitions[symbol]
         
         return current_state.is_final
 
+    def search(self, text, pos=0):
+        # Leftmost-longest match inside text at or after pos, as (start, end), or None
+        return Searcher(self).search(text, pos)
+
+    def count(self, text, pos=0):
+        # Number of matches finditer reports
+        return Searcher(self).count(text, pos)
+
+    def finditer(self, text, pos=0):
+        # Non-overlapping leftmost-longest matches (start, end), from left to right. Each call
+        # determinises the reverse DFA anew; to search many texts, keep one searcher()
+        return Searcher(self).finditer(text, pos)
+
+    def searcher(self):
+        # Searcher owning its own lazy reverse DFA, reusable across texts by one thread
+        return Searcher(self)
+
+    def search_index(self):
+        # (predecessors, finals): for each symbol, the DFA states with a transition into each state,
+        # and the final states. Built once, under a lock as the scanner may be shared, and only read
+        if self.search_tables is None:
+            with self.search_lock:
+                if self.search_tables is None:
+                    predecessors = {}
+                    for state in self.dfa:
+                        for symbol, target in state.transitions.items():
+                            predecessors.setdefault(symbol, {}).setdefault(target.state_id, []).append(state.state_id)
+                    finals = frozenset(state.state_id for state in self.dfa if state.is_final)
+                    self.search_tables = (predecessors, finals)
+        return self.search_tables
+
+    def symbol_of(self, char):
+        # Transition label reading char: its symbol class, or None if no transition reads it
+        return char if self.classes is None else self.classes.name_of(char)
+
+    def symbol_ranges(self, symbol):
+        # Code point ranges (lo, hi), inclusive and in order, of the characters a transition label reads
+        if self.classes is None:
+            return [[ord(symbol), ord(symbol)]]
+        return self.classes.ranges_of(symbol)
+
+    def count_table(self, length):
+        # suffix_counts[k][i] is the number of strings of length k leading from state i to a final state.
+        # A transition labelled with a symbol class such as [a-z] counts once per character of the class
+        if not self.dfa:
+            raise Exception("DFA not generated yet")
+
+        if self.suffix_counts is None:
+            self.suffix_counts = [[1 if state.is_final else 0 for state in self.dfa]]
+
+        counts = self.suffix_counts
+        if len(counts) <= length:
+            moves = [[(sum(hi - lo + 1 for lo, hi in self.symbol_ranges(symbol)), next_state.state_id)
+                      for symbol, next_state in state.transitions.items()] for state in self.dfa]
+        while len(counts) <= length:
+            previous = counts[-1]
+            counts.append([sum(size * previous[target] for size, target in state_moves)
+                           for state_moves in moves])
+        return counts
+
+    def count_accepted(self, length):
+        """Number of accepted strings of the given length.
+
+        >>> from compile_cache import compile_regex
+        >>> scanner = compile_regex('[a-z]{2}')
+        >>> scanner.count_accepted(2)
+        676
+        >>> sum(scanner.test_input(string) for string in scanner.accepted_strings(2))
+        676
+        """
+        return self.count_table(length)[length][0]
+
+    def accepted_strings(self, length, start=0):
+        # Lazily yield the accepted strings of exactly this length in lexicographic order,
+        # beginning with the start-th one (0 based), without visiting rejected prefixes.
+        # Symbol classes are expanded into their characters, so every string passes test_input
+        counts = self.count_table(length)
+        if start >= counts[length][0]:
+            return
+
+        # Characters leaving each state as (lo, hi, target) ranges in code point order; the
+        # classes of a DFA state's transitions are disjoint, so the ranges do not overlap
+        segments = [sorted((lo, hi, next_state.state_id)
+                           for symbol, next_state in state.transitions.items()
+                           for lo, hi in self.symbol_ranges(symbol))
+                    for state in self.dfa]
+        path = []  # (state, index of the range, code point taken) for each position of word
+        word = []
+
+        # Unrank the start-th string: take the character whose subtree contains it
+        state, rank = 0, start
+        for remaining in range(length, 0, -1):
+            below = counts[remaining - 1]
+            for index, (lo, hi, target) in enumerate(segments[state]):
+                subtree = below[target]
+                if rank < (hi - lo + 1) * subtree:
+                    break
+                rank -= (hi - lo + 1) * subtree
+            code, rank = lo + rank // subtree, rank % subtree
+            path.append((state, index, code))
+            word.append(chr(code))
+            state = target
+        yield ''.join(word)
+
+        # Successor: back up to the deepest position with a larger viable character, then take
+        # the smallest viable character at every following position
+        while path:
+            state, index, code = path.pop()
+            word.pop()
+            remaining = length - len(path)
+            lo, hi, target = segments[state][index]
+            if code < hi:
+                code += 1
+            else:
+                for index in range(index + 1, len(segments[state])):
+                    lo, hi, target = segments[state][index]
+                    if counts[remaining - 1][target]:
+                        break
+                else:
+                    continue
+                code = lo
+
+            path.append((state, index, code))
+            word.append(chr(code))
+            state = target
+            for remaining in range(remaining - 1, 0, -1):
+                for index, (lo, hi, target) in enumerate(segments[state]):
+                    if counts[remaining - 1][target]:
+                        break
+                path.append((state, index, lo))
+                word.append(chr(lo))
+                state = target
+            yield ''.join(word)
+
     def process_string_step_by_step(self, input_string):
         if not self.dfa:
             raise Exception("DFA not generated yet")
@@ -235,10 +566,11 @@ class Scanner:
         steps.append((current_state.state_id, None))  # Initial state
         
         for i, char in enumerate(input_string):
-            if char not in current_state.transitions:
+            symbol = self.symbol_of(char)
+            if symbol not in current_state.transitions:
                 return steps + [(None, None)]  # Indicate rejection
-            next_state = current_state.transitions[char]
-            steps.append((current_state.state_id, (char, next_state.state_id)))
+            next_state = current_state.transitions[symbol]
+            steps.append((current_state.state_id, (symbol, next_state.state_id)))
             current_state = next_state
         
         steps.append((current_state.state_id, None))  # Final state
@@ -342,10 +674,11 @@ class Scanner:
         steps.append((list(current_states), None))  # Initial state(s)
         
         for char in input_string:
+            symbol = char if nfa.classes is None else nfa.classes.name_of(char)
             next_states = set()
             for state in current_states:
-                if char in state.transitions:
-                    next_states.update(state.transitions[char])
+                if symbol in state.transitions:
+                    next_states.update(state.transitions[symbol])
             
             if not next_states:
                 return steps + [([], None)]  # Indicate rejection
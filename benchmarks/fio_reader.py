@@ -0,0 +1,71 @@
+"""Compares FAdo's Lark based file reader with the streaming reader.
+
+Run from the repository root:
+    python benchmarks/fio_reader.py --states 1000 --symbols 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "First_Version - GraphViz"))
+
+from FAdo import fio
+
+
+def write_random_dfa(path, states, symbols, count, seed):
+    rng = random.Random(seed)
+    alphabet = [f"s{i}" for i in range(symbols)]
+    with open(path, "w") as f:
+        for _ in range(count):
+            finals = " ".join(str(s) for s in range(states) if rng.random() < 0.3)
+            f.write(f"@DFA {finals}\n")
+            for s in range(states):
+                for a in alphabet:
+                    f.write(f"{s} {a} {rng.randrange(states)}\n")
+
+
+def measure(label, read):
+    tracemalloc.start()
+    start = time.perf_counter()
+    automata = read()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} {elapsed:8.3f} s  peak {peak / 2**20:8.1f} MiB  ({automata} automata)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--states", type=int, default=1000)
+    parser.add_argument("--symbols", type=int, default=4)
+    parser.add_argument("--count", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".fa")
+    os.close(fd)
+    try:
+        write_random_dfa(path, args.states, args.symbols, args.count, args.seed)
+        print(f"{args.count} DFA(s), {args.states} states, {args.symbols} symbols, "
+              f"{os.path.getsize(path) / 2**20:.1f} MiB on disk")
+
+        def lark_reader():
+            o = fio.readFromFile(path)
+            return len(o) if isinstance(o, list) else 1
+
+        def streaming_reader():
+            # Only one automaton is alive at a time, as a consumer would use it
+            return sum(1 for _ in fio.iterFromFile(path))
+
+        measure("lark", lark_reader)
+        measure("streaming", streaming_reader)
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Times every stage of the regex to DFA pipeline, for the Recent_Version and the FAdo pipelines.
+
+Run from the repository root:
+    python benchmarks/pipeline.py --output results.json
+    python benchmarks/pipeline.py --baseline results.json
+
+Stages: parse, nfa (construction), dfa (determinisation), min (minimisation, FAdo only),
+match (throughput of DFA runs on random words) and render (DOT source; PNG as well when the
+Graphviz executables are installed). Workloads:
+    random     random regexes of a given size, star height and alphabet size
+    nth_last   (a|b)*a(a|b)^(n-1), whose minimal DFA has 2^n states
+    witness    FAdo's worst case NFA families for determinisation (FAdo pipeline only,
+               starting at the dfa stage)
+Each stage is run --repeat times on fresh inputs; min and median wall times are reported in
+seconds. The JSON output can be passed back with --baseline to print the change per stage.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "First_Version - GraphViz"))
+sys.path.insert(0, os.path.join(ROOT, "Recent_Version"))
+
+from FAdo import witness
+from FAdo.reex import str2regexp
+from regex_parser import RegexParser
+from regex_to_nfa import RegexToNFA
+from scanner_generator import ScannerGenerator
+
+SYMBOLS = "abcdefghijklmnopqrstuvwxyz0123456789"
+WITNESSES = {
+    "toDFAWC2MF": witness.toDFAWC2MF,
+    "toDFAWC2": witness.toDFAWC2,
+    "toDFAWC3": witness.toDFAWC3,
+}
+
+
+def random_tree(rng, size, height, alphabet):
+    """Random regex tree with size symbols and star height exactly height"""
+    if height > 0 and (size == 1 or rng.random() < 0.3):
+        return ("star", random_tree(rng, size, height - 1, alphabet))
+    if size == 1:
+        return ("symbol", rng.choice(alphabet))
+    left = rng.randint(1, size - 1)
+    heights = [height, rng.randint(0, height)]
+    rng.shuffle(heights)
+    return (rng.choice(("union", "concat")),
+            random_tree(rng, left, heights[0], alphabet),
+            random_tree(rng, size - left, heights[1], alphabet))
+
+
+def nth_last_tree(n):
+    any_symbol = ("union", ("symbol", "a"), ("symbol", "b"))
+    tree = ("concat", ("star", any_symbol), ("symbol", "a"))
+    for _ in range(n - 1):
+        tree = ("concat", tree, any_symbol)
+    return tree
+
+
+def to_syntax(tree, union):
+    """Regex text of a tree; union is '|' for Recent_Version and '+' for FAdo"""
+    kind = tree[0]
+    if kind == "symbol":
+        return tree[1]
+    if kind == "star":
+        inner = to_syntax(tree[1], union)
+        return (inner if tree[1][0] == "symbol" else f"({inner})") + "*"
+    left, right = to_syntax(tree[1], union), to_syntax(tree[2], union)
+    if kind == "union":
+        return f"({left}{union}{right})"
+    return f"({left})({right})" if union == "+" else f"{left}{right}"
+
+
+def random_words(rng, alphabet, count, length):
+    return ["".join(rng.choice(alphabet) for _ in range(length)) for _ in range(count)]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def summary(times):
+    return {"min": min(times), "median": statistics.median(times), "runs": len(times)}
+
+
+def can_render_png():
+    return shutil.which("dot") is not None
+
+
+def run_recent(regex, words, repeat, png):
+    stages = {name: [] for name in ("parse", "nfa", "dfa", "match", "render")}
+    if png:
+        stages["render_png"] = []
+    sizes = {}
+    for _ in range(repeat):
+        t, parsed = timed(RegexParser().parse, regex)
+        stages["parse"].append(t)
+        t, nfa = timed(RegexToNFA().convert, parsed)
+        stages["nfa"].append(t)
+        scanner = ScannerGenerator()
+        t, _ = timed(scanner.nfa_to_dfa, nfa)
+        stages["dfa"].append(t)
+        t, accepted = timed(lambda: sum(scanner.test_input(w) for w in words))
+        stages["match"].append(t)
+        t, graph = timed(scanner.visualize_dfa)
+        t_source, _ = timed(lambda: graph.source)
+        stages["render"].append(t + t_source)
+        if png:
+            t, _ = timed(graph.pipe, "png")
+            stages["render_png"].append(t)
+        sizes = {"nfa_states": len(nfa.states), "dfa_states": len(scanner.dfa), "accepted": accepted}
+    return stages, sizes
+
+
+def run_fado(regex, nfa_factory, alphabet, words, repeat, png):
+    stages = {name: [] for name in ("parse", "nfa", "dfa", "min", "match", "render")}
+    if regex is None:
+        del stages["parse"], stages["nfa"]
+    if png:
+        stages["render_png"] = []
+    sizes = {}
+    for _ in range(repeat):
+        if regex is not None:
+            t, parsed = timed(str2regexp, regex)
+            stages["parse"].append(t)
+            # Words may use symbols the regex does not, which evalWordP only accepts if they are in Sigma
+            parsed.setSigma(set(alphabet))
+            t, nfa = timed(parsed.toNFA)
+            stages["nfa"].append(t)
+        else:
+            nfa = nfa_factory()
+        t, dfa = timed(nfa.toDFA)
+        stages["dfa"].append(t)
+        t, minimal = timed(dfa.minimal)
+        stages["min"].append(t)
+        t, accepted = timed(lambda: sum(minimal.evalWordP(w) for w in words))
+        stages["match"].append(t)
+        t, _ = timed(minimal.dotFormat)
+        stages["render"].append(t)
+        if png:
+            dot = minimal.dotFormat()
+            t, _ = timed(subprocess.run, ["dot", "-Tpng"], input=dot.encode("utf-8"), capture_output=True)
+            stages["render_png"].append(t)
+        sizes = {"nfa_states": len(nfa.States), "dfa_states": len(dfa.States), "min_states": len(minimal.States),
+                 "accepted": accepted}
+    return stages, sizes
+
+
+def result(workload, params, pipeline, stages, sizes, words):
+    out = {"workload": workload, "params": params, "pipeline": pipeline,
+           "stages": {name: summary(times) for name, times in stages.items()}, "sizes": sizes}
+    symbols = sum(len(w) for w in words)
+    out["match_symbols_per_s"] = symbols / out["stages"]["match"]["min"] if out["stages"]["match"]["min"] else None
+    return out
+
+
+def workloads(args):
+    """(workload name, params, tree or witness NFA, alphabet)"""
+    for size in args.sizes:
+        for height in args.star_heights:
+            for k in args.alphabets:
+                alphabet = SYMBOLS[:k]
+                for i in range(args.samples):
+                    params = {"size": size, "star_height": height, "alphabet": k, "sample": i}
+                    rng = random.Random(seed_for(args.seed, "random", params))
+                    yield "random", params, random_tree(rng, size, height, alphabet), alphabet
+    for n in args.nth_last:
+        yield "nth_last", {"n": n}, nth_last_tree(n), "ab"
+    for name in args.witnesses:
+        for m in args.witness_states:
+            nfa = WITNESSES[name](m)
+            yield "witness", {"family": name, "states": m}, nfa, "".join(sorted(nfa.Sigma))
+
+
+def seed_for(seed, workload, params):
+    # Each workload gets the same regex and words whatever else is selected on the command line
+    return f"{seed}:{workload}:{json.dumps(params, sort_keys=True)}"
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def key(r):
+        return r["workload"], json.dumps(r["params"], sort_keys=True), r["pipeline"]
+
+    old = {key(r): r for r in baseline["results"]}
+    for r in results:
+        before = old.get(key(r))
+        if before is None:
+            continue
+        changes = []
+        for stage, timing in r["stages"].items():
+            if stage in before["stages"] and before["stages"][stage]["min"] > 0:
+                changes.append(f"{stage} {timing['min'] / before['stages'][stage]['min']:.2f}x")
+        print(f"{r['workload']:<9} {r['pipeline']:<7} {json.dumps(r['params'], sort_keys=True)}: "
+              + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10, 40])
+    parser.add_argument("--star-heights", type=int, nargs="*", default=[1, 2])
+    parser.add_argument("--alphabets", type=int, nargs="*", default=[2, 4])
+    parser.add_argument("--samples", type=int, default=2, help="random regexes per parameter combination")
+    parser.add_argument("--nth-last", type=int, nargs="*", default=[4, 8])
+    parser.add_argument("--witnesses", nargs="*", default=sorted(WITNESSES), choices=sorted(WITNESSES))
+    parser.add_argument("--witness-states", type=int, nargs="*", default=[6, 8])
+    parser.add_argument("--words", type=int, default=1000, help="random words per match run")
+    parser.add_argument("--word-length", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-png", action="store_true", help="skip PNG rendering even if Graphviz is installed")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    png = not args.no_png and can_render_png()
+    results = []
+    for workload, params, subject, alphabet in workloads(args):
+        rng = random.Random(seed_for(args.seed, "words", [workload, params]))
+        words = random_words(rng, alphabet, args.words, args.word_length)
+        if workload == "witness":
+            stages, sizes = run_fado(None, lambda: subject.dup(), alphabet, words, args.repeat, png)
+            results.append(result(workload, params, "fado", stages, sizes, words))
+        else:
+            stages, sizes = run_recent(to_syntax(subject, "|"), words, args.repeat, png)
+            results.append(result(workload, params, "recent", stages, sizes, words))
+            stages, sizes = run_fado(to_syntax(subject, "+"), None, alphabet, words, args.repeat, png)
+            results.append(result(workload, params, "fado", stages, sizes, words))
+        print(f"{workload} {json.dumps(params, sort_keys=True)} done", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "png_rendering": png,
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.baseline:
+        compare(results, args.baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    elif not args.baseline:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+
+if __name__ == "__main__":
+    main()